@@ -5,3 +5,8 @@ class WaterTrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.water_tracker.backend'
     label = 'water_tracker'
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
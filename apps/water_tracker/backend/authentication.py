@@ -0,0 +1,65 @@
+"""
+Expiring token authentication for the API.
+
+Login issues a random key; the client sends it as ``Authorization: Token <key>``.
+Validating a request is a single indexed lookup on the key's SHA-256 digest,
+instead of re-running the password hasher on every call as Basic
+authentication does.
+"""
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .models import AuthToken
+
+
+def key_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_token(user):
+    """
+    Create a token for ``user`` and return ``(key, token)``. The plain key is
+    only available here; expired tokens of the user are cleaned up on the way.
+    """
+    now = timezone.now()
+    AuthToken.objects.filter(user=user, expires_at__lte=now).delete()
+    key = secrets.token_urlsafe(32)
+    token = AuthToken.objects.create(
+        key_digest=key_digest(key),
+        user=user,
+        expires_at=now + settings.AUTH_TOKEN_TTL,
+    )
+    return key, token
+
+
+class ExpiringTokenAuthentication(BaseAuthentication):
+    keyword = "Token"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        token = (
+            AuthToken.objects.select_related("user")
+            .filter(key_digest=key_digest(key), expires_at__gt=timezone.now())
+            .first()
+        )
+        if token is None or not token.user.is_active:
+            raise exceptions.AuthenticationFailed("Invalid or expired token.")
+        return token.user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
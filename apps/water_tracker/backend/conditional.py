@@ -0,0 +1,89 @@
+"""
+HTTP conditional GET for read-mostly endpoints.
+
+Responses carry a strong ``ETag`` derived from the data version (see
+``report_cache``), the request path and its normalized query parameters. A
+matching ``If-None-Match`` is answered with 304 before the view runs, so no
+report queries are executed. No ``Last-Modified`` is sent: its one-second
+resolution cannot tell apart two writes in the same second.
+
+The ETag is also keyed by the current date, because several views default to
+or include "today". Date ranges that end before today may be reused by the
+client for ``PAST_RANGE_CACHE_MAX_AGE`` seconds; everything else must be
+revalidated on each use.
+"""
+import functools
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+
+from .report_cache import data_version, normalize_params
+
+
+def _etag(request, version, today):
+    params = normalize_params(request.query_params, {})
+    tag = f'{version}:{today.isoformat()}:{request.path}:{params}'
+    return '"%s"' % hashlib.sha256(tag.encode()).hexdigest()[:32]
+
+
+def _range_ends_before(request, today):
+    end_date = request.query_params.get('end_date')
+    end_year = request.query_params.get('end_year')
+    try:
+        if end_date:
+            return date.fromisoformat(end_date) < today
+        if end_year:
+            return int(end_year) < today.year
+    except ValueError:
+        pass
+    return False
+
+
+def _add_headers(response, request, etag, today):
+    response.headers['ETag'] = etag
+    if _range_ends_before(request, today):
+        patch_cache_control(response, private=True, max_age=settings.PAST_RANGE_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+
+
+def conditional_get(view):
+    """
+    Decorator for a view function taking ``(request, *args, **kwargs)``; use
+    ``conditional_method`` on view methods.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        today = date.today()
+        etag = _etag(request, data_version(request)[0], today)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            _add_headers(response, request, etag, today)
+        return response
+
+    return wrapper
+
+
+conditional_method = method_decorator(conditional_get)
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding conditional GET to ``list`` and ``retrieve``.
+    """
+    @conditional_method
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_method
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
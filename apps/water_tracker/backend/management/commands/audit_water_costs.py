@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.water_tracker.backend.models import WaterEntry
+from apps.water_tracker.backend.repricing import audit_costs
+
+
+class Command(BaseCommand):
+    help = "Compare stored water entry costs with the rate history, by source and month"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-date", type=date.fromisoformat, metavar="YYYY-MM-DD",
+            help="Only entries on or after this date",
+        )
+        parser.add_argument(
+            "--end-date", type=date.fromisoformat, metavar="YYYY-MM-DD",
+            help="Only entries on or before this date",
+        )
+        parser.add_argument(
+            "--entries", action="store_true",
+            help="Also print the ids of the mismatched entries",
+        )
+
+    def handle(self, *args, **options):
+        entries = WaterEntry.objects.all()
+        if options["start_date"]:
+            entries = entries.filter(entry_date__gte=options["start_date"])
+        if options["end_date"]:
+            entries = entries.filter(entry_date__lte=options["end_date"])
+
+        summary, groups = audit_costs(entries)
+
+        for group in groups:
+            self.stdout.write(
+                f"{group['month']:%Y-%m}  {group['source_name'] or '(no source)':30}  "
+                f"{group['mismatches']:>5}/{group['entries']:<5}  "
+                f"stored {group['stored_cost']:>12}  expected {group['expected_cost']:>12}  "
+                f"({group['stored_cost'] - group['expected_cost']:+})"
+            )
+            if options["entries"]:
+                self.stdout.write(f"         entries: {' '.join(map(str, group['entry_ids']))}")
+
+        message = (
+            f"{summary['mismatches']} of {summary['entries']} water entries differ from their rates, "
+            f"stored {summary['stored_cost']} vs expected {summary['expected_cost']}"
+        )
+        style = self.style.WARNING if summary["mismatches"] else self.style.SUCCESS
+        self.stdout.write(style(message))
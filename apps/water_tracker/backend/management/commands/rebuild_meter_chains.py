@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.water_tracker.backend.meter_readings import rebuild_meter_chain
+from apps.water_tracker.backend.models import ConsumptionEntry, YieldEntry
+
+
+class Command(BaseCommand):
+    help = "Recompute previous readings and liters of all yield and consumption entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", choices=["yield", "consumption", "all"], default="all",
+            help="Which meter entries to rebuild",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of entries fetched and updated per statement",
+        )
+
+    def handle(self, *args, **options):
+        models = {"yield": [YieldEntry], "consumption": [ConsumptionEntry]}.get(
+            options["model"], [YieldEntry, ConsumptionEntry]
+        )
+        for model in models:
+            count = rebuild_meter_chain(model, batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {model._meta.db_table}: {count} entries updated")
+            )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.water_tracker.backend.rollups import rebuild_daily_rollup
+
+
+class Command(BaseCommand):
+    help = "Re-derive water categories and rebuild the daily_water_rollups table from all water entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of rollup rows inserted per statement",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_rollup(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily water rollup: {count} rows"))
@@ -0,0 +1,103 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from apps.water_tracker.backend.models import (
+    RateHistoryInternalVehicle,
+    RateHistoryPipeline,
+    RateHistoryVendor,
+    WaterEntry,
+)
+from apps.water_tracker.backend.repricing import entries_priced_at, reprice_entries
+
+RATE_OPTIONS = {
+    "vendor_rate": RateHistoryVendor,
+    "vehicle_rate": RateHistoryInternalVehicle,
+    "pipeline_rate": RateHistoryPipeline,
+}
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored cost of water entries from the current rate history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--vendor-rate", type=int, action="append", default=[], metavar="ID",
+            help="Only entries priced at this vendor rate history row (repeatable)",
+        )
+        parser.add_argument(
+            "--vehicle-rate", type=int, action="append", default=[], metavar="ID",
+            help="Only entries priced at this internal vehicle rate history row (repeatable)",
+        )
+        parser.add_argument(
+            "--pipeline-rate", type=int, action="append", default=[], metavar="ID",
+            help="Only entries priced at this pipeline rate history row (repeatable)",
+        )
+        parser.add_argument(
+            "--since", type=date.fromisoformat, metavar="YYYY-MM-DD",
+            help="Only entries on or after this date, e.g. the old effective date of a moved rate",
+        )
+        parser.add_argument(
+            "--until", type=date.fromisoformat, metavar="YYYY-MM-DD",
+            help="Only entries on or before this date",
+        )
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Reprice every water entry; required when no rate or date filter is given",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report the changes without writing them",
+        )
+        parser.add_argument(
+            "--diff", action="store_true",
+            help="Print the old and new cost of every changed entry",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of entries fetched and updated per statement",
+        )
+
+    def handle(self, *args, **options):
+        scoped = any(options[option] for option in (*RATE_OPTIONS, "since", "until"))
+        if not scoped and not options["all"]:
+            raise CommandError(
+                "Pass --vendor-rate/--vehicle-rate/--pipeline-rate, --since/--until, "
+                "or --all to reprice every water entry"
+            )
+        entries = WaterEntry.objects.all()
+
+        rate_filter = Q()
+        for option, model in RATE_OPTIONS.items():
+            for rate_id in options[option]:
+                try:
+                    rate = model.objects.get(pk=rate_id)
+                except model.DoesNotExist:
+                    raise CommandError(f"{model._meta.db_table} has no row {rate_id}")
+                rate_filter |= entries_priced_at(rate)
+        if rate_filter:
+            entries = entries.filter(rate_filter)
+        if options["since"]:
+            entries = entries.filter(entry_date__gte=options["since"])
+        if options["until"]:
+            entries = entries.filter(entry_date__lte=options["until"])
+
+        changes = reprice_entries(
+            entries, batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+
+        if options["diff"]:
+            for entry, old in changes:
+                self.stdout.write(
+                    f"{entry.pk:>8}  {entry.entry_date}  "
+                    f"{old['total_cost']} -> {entry.total_cost}  "
+                    f"({entry.total_cost - old['total_cost']:+})  "
+                    f"per KL {old['snapshot_cost_per_kl']} -> {entry.snapshot_cost_per_kl}"
+                )
+
+        delta = sum(entry.total_cost - old["total_cost"] for entry, old in changes)
+        verb = "Would reprice" if options["dry_run"] else "Repriced"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {len(changes)} water entries, total cost change {delta:+}")
+        )
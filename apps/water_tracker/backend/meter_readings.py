@@ -0,0 +1,188 @@
+"""
+Shared meter-reading lookups for yield and consumption entries.
+
+Both entry models store one cumulative meter reading per location and day;
+``previous_reading`` is the reading of the latest entry before that day. The
+helpers below resolve readings for many locations at once so that the bulk
+data-entry endpoints run a constant number of queries regardless of how many
+meters are configured.
+
+Each location's entries form a chain: writing an entry changes the
+``previous_reading`` (and liters) of the next entry for that location.
+``repair_successors`` fixes just those rows after a write and
+``rebuild_meter_chain`` re-derives every chain from scratch.
+"""
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import ConsumptionEntry, YieldEntry
+from .report_cache import bump_data_version
+
+
+ENTRY_ORDERING = ('-date', '-created_at')
+
+LITERS_FIELDS = {
+    YieldEntry: 'yield_liters',
+    ConsumptionEntry: 'consumption_liters',
+}
+
+
+def liters_between(previous_reading, current_reading):
+    """Meter readings are in KL; a drop in the reading counts as zero."""
+    difference = current_reading - previous_reading if current_reading > previous_reading else 0
+    return difference * 1000
+
+
+def has_manual_liters(entry):
+    # Manual yield locations record liters directly instead of deriving them
+    return isinstance(entry, YieldEntry) and entry.location.is_manual_yield
+
+
+def entries_on(model, location_ids, day):
+    """
+    Return ``{location_id: entry}`` for the entries of ``model`` dated ``day``.
+    If a location has several entries that day the newest one wins.
+    """
+    entries = {}
+    for entry in model.objects.filter(location_id__in=location_ids, date=day).order_by('-created_at'):
+        entries.setdefault(entry.location_id, entry)
+    return entries
+
+
+def _first_entry_per_location(entries, ordering):
+    """
+    Keep the first entry per location of ``entries`` under ``ordering`` in one
+    query: ``DISTINCT ON`` where supported (PostgreSQL), else ``ROW_NUMBER()``.
+    """
+    if connection.features.can_distinct_on_fields:
+        entries = entries.order_by('location_id', *ordering).distinct('location_id')
+    else:
+        entries = entries.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('location_id'),
+                order_by=[
+                    F(field[1:]).desc() if field.startswith('-') else F(field).asc()
+                    for field in ordering
+                ],
+            )
+        ).filter(row_number=1)
+    return {entry.location_id: entry for entry in entries}
+
+
+def latest_entries_before(model, location_ids, day):
+    """
+    Return ``{location_id: entry}`` with the latest entry of ``model`` strictly
+    before ``day`` for each location, in one query.
+    """
+    entries = model.objects.filter(location_id__in=location_ids, date__lt=day)
+    return _first_entry_per_location(entries, ENTRY_ORDERING)
+
+
+def previous_readings(model, location_ids, day):
+    """
+    Return ``{location_id: reading}`` with the meter reading each location had
+    before ``day`` (0 when there is no earlier entry).
+    """
+    latest = latest_entries_before(model, location_ids, day)
+    return {
+        location_id: latest[location_id].current_reading if location_id in latest else 0
+        for location_id in location_ids
+    }
+
+
+def upsert_entries(model, entries, update_fields):
+    """
+    Insert ``entries`` or, where the location already has an entry on that
+    day, overwrite ``update_fields`` of the existing row, in one statement
+    per batch.
+    """
+    entries = model.objects.bulk_create(
+        entries,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['location', 'date'],
+        update_fields=update_fields,
+    )
+    bump_data_version()
+    return entries
+
+
+def _relink(entry, previous_reading):
+    """
+    Point ``entry`` at ``previous_reading`` and recompute its liters.
+    Returns whether anything changed.
+    """
+    liters_field = LITERS_FIELDS[type(entry)]
+    liters = getattr(entry, liters_field)
+    if not has_manual_liters(entry):
+        liters = liters_between(previous_reading, entry.current_reading)
+
+    if entry.previous_reading == previous_reading and getattr(entry, liters_field) == liters:
+        return False
+    entry.previous_reading = previous_reading
+    setattr(entry, liters_field, liters)
+    return True
+
+
+def repair_successors(model, location_ids, day):
+    """
+    Recompute ``previous_reading`` and liters of the first entry after ``day``
+    for each of ``location_ids``, after entries on ``day`` were written or
+    deleted. Later entries are unaffected, so this touches at most one row per
+    location in three queries. Returns the number of rows updated.
+    """
+    successors = _first_entry_per_location(
+        model.objects.filter(location_id__in=location_ids, date__gt=day).select_related('location'),
+        ('date', 'created_at'),
+    )
+    if not successors:
+        return 0
+
+    # The successor's predecessor is now the latest entry on or before ``day``
+    latest = _first_entry_per_location(
+        model.objects.filter(location_id__in=list(successors), date__lte=day),
+        ENTRY_ORDERING,
+    )
+    changed = [
+        entry for location_id, entry in successors.items()
+        if _relink(entry, latest[location_id].current_reading if location_id in latest else 0)
+    ]
+    if changed:
+        model.objects.bulk_update(changed, ['previous_reading', LITERS_FIELDS[model]])
+        bump_data_version()
+    return len(changed)
+
+
+def rebuild_meter_chain(model, batch_size=1000):
+    """
+    Re-derive ``previous_reading`` and liters of every entry of ``model`` in a
+    single pass over each location's entries in date order. Returns the number
+    of rows updated.
+    """
+    update_fields = ['previous_reading', LITERS_FIELDS[model]]
+    updated = 0
+    location_ids = list(model.objects.order_by().values_list('location_id', flat=True).distinct())
+    for location_id in location_ids:
+        entries = (
+            model.objects.filter(location_id=location_id)
+            .select_related('location')
+            .order_by('date', 'created_at')
+        )
+        with transaction.atomic():
+            changed = []
+            previous_reading = 0
+            for entry in entries.iterator(chunk_size=batch_size):
+                if _relink(entry, previous_reading):
+                    changed.append(entry)
+                previous_reading = entry.current_reading
+                if len(changed) >= batch_size:
+                    model.objects.bulk_update(changed, update_fields)
+                    updated += len(changed)
+                    changed = []
+            model.objects.bulk_update(changed, update_fields)
+            updated += len(changed)
+    if updated:
+        bump_data_version()
+    return updated
@@ -0,0 +1,76 @@
+# Generated by Django 6.0.2 on 2026-10-16 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Sum, Value, When
+
+
+def populate_rollup(apps, schema_editor):
+    WaterEntry = apps.get_model('water_tracker', 'WaterEntry')
+    DailyWaterRollup = apps.get_model('water_tracker', 'DailyWaterRollup')
+
+    rows = (
+        WaterEntry.objects.annotate(
+            category=Case(
+                When(source__source_type='Pipeline', then=Value('Corporation Water')),
+                default=F('water_type'),
+            )
+        )
+        .order_by()
+        .values('entry_date', 'category', 'source_id', 'loading_location_id',
+                'unloading_location_id', 'vehicle_id')
+        .annotate(
+            entry_count=Count('id'),
+            loads=Sum('load_count'),
+            liters=Sum('total_quantity_liters'),
+            cost=Sum('total_cost'),
+        )
+    )
+    DailyWaterRollup.objects.bulk_create(
+        [
+            DailyWaterRollup(
+                date=row['entry_date'],
+                water_category=row['category'],
+                source_id=row['source_id'],
+                loading_location_id=row['loading_location_id'],
+                unloading_location_id=row['unloading_location_id'],
+                vehicle_id=row['vehicle_id'],
+                entry_count=row['entry_count'],
+                loads=row['loads'],
+                liters=row['liters'] or 0,
+                cost=row['cost'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0013_consumptionlocation_sort_order_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWaterRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('water_category', models.CharField(blank=True, choices=[('Corporation Water', 'Corporation Water'), ('Drinking Water', 'Drinking Water'), ('Normal Water (Salt)', 'Normal Water (Salt)')], max_length=50, null=True)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('loads', models.IntegerField(blank=True, null=True)),
+                ('liters', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('loading_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='water_tracker.masterlocation')),
+                ('source', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='water_tracker.mastersource')),
+                ('unloading_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='water_tracker.masterlocation')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='water_tracker.masterinternalvehicle')),
+            ],
+            options={
+                'db_table': 'daily_water_rollups',
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-16 10:05
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_water_category(apps, schema_editor):
+    WaterEntry = apps.get_model('water_tracker', 'WaterEntry')
+
+    WaterEntry.objects.filter(source__source_type='Pipeline').update(
+        water_category='Corporation Water'
+    )
+    WaterEntry.objects.exclude(source__source_type='Pipeline').update(
+        water_category=F('water_type')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0014_dailywaterrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='waterentry',
+            name='water_category',
+            field=models.CharField(blank=True, choices=[('Corporation Water', 'Corporation Water'), ('Drinking Water', 'Drinking Water'), ('Normal Water (Salt)', 'Normal Water (Salt)')], max_length=50, null=True),
+        ),
+        migrations.RunPython(backfill_water_category, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='waterentry',
+            index=models.Index(fields=['water_category', 'entry_date'], name='water_entri_water_c_5d1911_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-16 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0015_waterentry_water_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consumptionentry',
+            index=models.Index(fields=['location', '-date', '-created_at'], name='consumption_locatio_6848a3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consumptionentry',
+            index=models.Index(fields=['-date', '-created_at'], name='consumption_date_183c23_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratehistoryinternalvehicle',
+            index=models.Index(fields=['vehicle', 'loading_location', 'effective_date'], name='rate_histor_vehicle_7e2cb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratehistorypipeline',
+            index=models.Index(fields=['source', 'effective_date'], name='rate_histor_source__656139_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratehistoryvendor',
+            index=models.Index(fields=['source', 'water_type', 'effective_date'], name='rate_histor_source__2f8746_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waterentry',
+            index=models.Index(fields=['-entry_date', '-created_at'], name='water_entri_entry_d_0bd2c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waterentry',
+            index=models.Index(fields=['source', 'entry_date'], name='water_entri_source__5fca1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yieldentry',
+            index=models.Index(fields=['location', '-date', '-created_at'], name='yield_entri_locatio_6aca11_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yieldentry',
+            index=models.Index(fields=['-date', '-created_at'], name='yield_entri_date_c74f01_idx'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 6.0.2 on 2026-10-16 11:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+LITERS_FIELDS = {
+    'YieldEntry': 'yield_liters',
+    'ConsumptionEntry': 'consumption_liters',
+}
+
+
+def relink_meter_chains(Entry, liters_field, location_ids):
+    """
+    Re-derive ``previous_reading`` and liters of every entry of ``location_ids``,
+    as ``meter_readings.rebuild_meter_chain`` does, on the historical model.
+    """
+    for location_id in location_ids:
+        changed = []
+        previous_reading = 0
+        entries = (
+            Entry.objects.filter(location_id=location_id)
+            .select_related('location')
+            .order_by('date', 'created_at')
+        )
+        for entry in entries:
+            liters = getattr(entry, liters_field)
+            if not getattr(entry.location, 'is_manual_yield', False):
+                difference = entry.current_reading - previous_reading
+                liters = difference * 1000 if difference > 0 else 0
+            if entry.previous_reading != previous_reading or getattr(entry, liters_field) != liters:
+                entry.previous_reading = previous_reading
+                setattr(entry, liters_field, liters)
+                changed.append(entry)
+            previous_reading = entry.current_reading
+        Entry.objects.bulk_update(changed, ['previous_reading', liters_field], batch_size=1000)
+
+
+def remove_duplicate_entries(apps, schema_editor):
+    # Keep the newest entry for each location and day, as the bulk entry grid does
+    for model_name, liters_field in LITERS_FIELDS.items():
+        Entry = apps.get_model('water_tracker', model_name)
+        duplicates = (
+            Entry.objects.order_by()
+            .values('location_id', 'date')
+            .annotate(entry_count=Count('id'))
+            .filter(entry_count__gt=1)
+        )
+        location_ids = set()
+        for duplicate in list(duplicates):
+            entries = list(
+                Entry.objects.filter(location_id=duplicate['location_id'], date=duplicate['date'])
+                .order_by('-created_at', '-id')
+                .values('id', 'current_reading')
+            )
+            kept, removed = entries[0], entries[1:]
+            for entry in removed:
+                print(
+                    f"\n  Removed duplicate {model_name} {entry['id']} "
+                    f"(location {duplicate['location_id']}, {duplicate['date']}, "
+                    f"reading {entry['current_reading']}); kept {kept['id']} "
+                    f"(reading {kept['current_reading']})",
+                    end='',
+                )
+            Entry.objects.filter(id__in=[entry['id'] for entry in removed]).delete()
+            location_ids.add(duplicate['location_id'])
+
+        # Successors may point at a deleted reading
+        relink_meter_chains(Entry, liters_field, sorted(location_ids))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0016_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='consumptionentry',
+            constraint=models.UniqueConstraint(fields=('location', 'date'), name='unique_consumption_entry_location_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='yieldentry',
+            constraint=models.UniqueConstraint(fields=('location', 'date'), name='unique_yield_entry_location_date'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-16 13:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# (name, code, loading location name match) for the groups the dashboard
+# previously matched by name
+INITIAL_GROUPS = [
+    ('Muthu Nagar', 'muthu-nagar', 'Muthu Nagar'),
+    ('Bannari', 'bannari', 'Bannari'),
+    ('Varahi', 'varahi', 'Varahi'),
+]
+
+
+def create_initial_groups(apps, schema_editor):
+    LocationGroup = apps.get_model('water_tracker', 'LocationGroup')
+    MasterLocation = apps.get_model('water_tracker', 'MasterLocation')
+
+    for sort_order, (name, code, match) in enumerate(INITIAL_GROUPS):
+        group, _ = LocationGroup.objects.get_or_create(
+            code=code, defaults={'name': name, 'sort_order': sort_order}
+        )
+        MasterLocation.objects.filter(
+            location_name__icontains=match, group__isnull=True
+        ).update(group=group)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0018_authtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('code', models.SlugField(unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'location_groups',
+                'ordering': ['sort_order', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='masterlocation',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='locations', to='water_tracker.locationgroup'),
+        ),
+        migrations.RunPython(create_initial_groups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-16 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0020_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataversion',
+            name='rates_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 6.0.2 on 2026-10-16 23:46
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations
+from django.db.models import F
+
+
+def _calculated_costs(cost, liters):
+    per_liter = Decimal(str(cost)) / Decimal(str(liters))
+    return tuple(
+        value.quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
+        for value in (per_liter * 1000, per_liter)
+    )
+
+
+def backfill_calculated_costs(apps, schema_editor):
+    RateHistoryVendor = apps.get_model('water_tracker', 'RateHistoryVendor')
+    RateHistoryInternalVehicle = apps.get_model('water_tracker', 'RateHistoryInternalVehicle')
+    DataVersion = apps.get_model('water_tracker', 'DataVersion')
+    fields = ['calculated_cost_per_kl', 'calculated_cost_per_liter']
+
+    vendor_rates = []
+    for rate in RateHistoryVendor.objects.all():
+        if rate.cost_type == 'Per_Liter':
+            liters = 1
+        elif rate.cost_type == 'Per_Load' and rate.vehicle_capacity:
+            liters = rate.vehicle_capacity
+        else:
+            continue
+        rate.calculated_cost_per_kl, rate.calculated_cost_per_liter = _calculated_costs(rate.rate_value, liters)
+        vendor_rates.append(rate)
+    RateHistoryVendor.objects.bulk_update(vendor_rates, fields, batch_size=1000)
+
+    vehicle_rates = []
+    for rate in RateHistoryInternalVehicle.objects.select_related('vehicle'):
+        if rate.vehicle is None or not rate.vehicle.capacity_liters:
+            continue
+        rate.calculated_cost_per_kl, rate.calculated_cost_per_liter = _calculated_costs(
+            rate.cost_per_load, rate.vehicle.capacity_liters
+        )
+        vehicle_rates.append(rate)
+    RateHistoryInternalVehicle.objects.bulk_update(vehicle_rates, fields, batch_size=1000)
+
+    # Bulk updates send no signals; drop cached reports and rate indexes
+    DataVersion.objects.filter(pk=1).update(version=F('version') + 1, rates_version=F('rates_version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0021_dataversion_rates_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_calculated_costs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+DIMENSIONS = ['water_category', 'water_type', 'source_id', 'loading_location_id',
+              'unloading_location_id', 'vehicle_id']
+
+
+def repopulate_rollup(apps, schema_editor):
+    WaterEntry = apps.get_model('water_tracker', 'WaterEntry')
+    DailyWaterRollup = apps.get_model('water_tracker', 'DailyWaterRollup')
+    DataVersion = apps.get_model('water_tracker', 'DataVersion')
+
+    rows = (
+        WaterEntry.objects.order_by()
+        .values('entry_date', *DIMENSIONS)
+        .annotate(
+            entry_count=Count('id'),
+            loads=Sum('load_count'),
+            liters=Sum('total_quantity_liters'),
+            cost=Sum('total_cost'),
+        )
+    )
+    DailyWaterRollup.objects.all().delete()
+    DailyWaterRollup.objects.bulk_create(
+        [
+            DailyWaterRollup(
+                date=row['entry_date'],
+                entry_count=row['entry_count'],
+                loads=row['loads'],
+                liters=row['liters'] or 0,
+                cost=row['cost'] or 0,
+                **{field: row[field] for field in DIMENSIONS},
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+    # Drop cached reports built from the old rows
+    DataVersion.objects.filter(pk=1).update(version=F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('water_tracker', '0022_backfill_rate_calculated_costs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailywaterrollup',
+            name='water_type',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.RunPython(repopulate_rollup, migrations.RunPython.noop),
+    ]
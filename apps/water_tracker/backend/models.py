@@ -1,3 +1,5 @@
+from decimal import Decimal, ROUND_HALF_UP
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -15,7 +17,51 @@ class User(AbstractUser):
         db_table = "users"
 
 
+class AuthToken(models.Model):
+    """
+    API token issued at login. Only a SHA-256 digest of the key is stored;
+    deleting the row revokes the token.
+    """
+    key_digest = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="auth_tokens")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "auth_tokens"
+
+
 # 2. Master Models (Reference Data)
+class LocationGroup(models.Model):
+    """
+    Named group of loading locations (e.g. the wells of one supplier) that the
+    dashboard and reports break purchases down by.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    code = models.SlugField(max_length=50, unique=True)
+    is_active = models.BooleanField(default=True)
+    sort_order = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "location_groups"
+        ordering = ["sort_order", "name"]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def matching(cls, location_name):
+        """
+        The active group whose name appears in ``location_name`` (case
+        insensitive), as the dashboard used to match wells by name.
+        """
+        location_name = (location_name or "").lower()
+        return next(
+            (group for group in cls.objects.filter(is_active=True) if group.name.lower() in location_name),
+            None,
+        )
+
+
 class MasterLocation(models.Model):
     location_name = models.CharField(max_length=100, unique=True)
     location_type = models.CharField(max_length=50, default="Unloading")
@@ -23,6 +69,13 @@ class MasterLocation(models.Model):
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     sort_order = models.IntegerField(default=0)
+    group = models.ForeignKey(
+        LocationGroup,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="locations",
+    )
 
     class Meta:
         db_table = "master_locations"
@@ -30,6 +83,12 @@ class MasterLocation(models.Model):
     def __str__(self):
         return self.location_name
 
+    def save(self, *args, **kwargs):
+        # New locations without a group join the one their name matches
+        if self._state.adding and self.group_id is None:
+            self.group = LocationGroup.matching(self.location_name)
+        super().save(*args, **kwargs)
+
 
 class MasterSource(models.Model):
     SOURCE_TYPE_CHOICES = (
@@ -59,6 +118,23 @@ class MasterInternalVehicle(models.Model):
     def __str__(self):
         return self.vehicle_name
 
+    def refresh_rate_costs(self):
+        """
+        Re-derive the calculated costs of this vehicle's rates at its current
+        capacity and write the changed ones with one ``bulk_update`` (no
+        signals). Returns the number of rates updated.
+        """
+        if not self.capacity_liters:
+            return 0
+        changed = []
+        for rate in RateHistoryInternalVehicle.objects.filter(vehicle=self):
+            costs = calculated_costs(rate.cost_per_load, self.capacity_liters)
+            if costs != (rate.calculated_cost_per_kl, rate.calculated_cost_per_liter):
+                rate.calculated_cost_per_kl, rate.calculated_cost_per_liter = costs
+                changed.append(rate)
+        RateHistoryInternalVehicle.objects.bulk_update(changed, CALCULATED_COST_FIELDS)
+        return len(changed)
+
 
 # Note: MasterVendorVehicle was in original models.py but seemingly unused in main logic?
 # It was defined but RateHistoryVendor used vehicle_capacity directly.
@@ -77,6 +153,33 @@ class MasterVendorVehicle(models.Model):
 
 
 # 3. Rate History Models (Cost Management)
+CALCULATED_COST_FIELDS = ("calculated_cost_per_kl", "calculated_cost_per_liter")
+
+
+def calculated_costs(cost, liters):
+    """
+    ``(cost per KL, cost per liter)`` of ``cost`` for ``liters``, rounded to
+    the 4 decimals of the calculated cost fields.
+    """
+    per_liter = Decimal(str(cost)) / Decimal(str(liters))
+    return tuple(
+        value.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+        for value in (per_liter * 1000, per_liter)
+    )
+
+
+def _set_calculated_costs(rate, costs, kwargs):
+    """
+    Set the calculated cost fields of ``rate`` to ``costs`` (left as they are
+    when None) and add them to the ``update_fields`` of the save ``kwargs``.
+    """
+    if costs is not None:
+        rate.calculated_cost_per_kl, rate.calculated_cost_per_liter = costs
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *CALCULATED_COST_FIELDS}
+
+
 class RateHistoryInternalVehicle(models.Model):
     vehicle = models.ForeignKey(
         MasterInternalVehicle, on_delete=models.CASCADE, null=True, blank=True
@@ -103,6 +206,16 @@ class RateHistoryInternalVehicle(models.Model):
 
     class Meta:
         db_table = "rate_history_internal_vehicles"
+        indexes = [
+            models.Index(fields=["vehicle", "loading_location", "effective_date"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Per KL / per liter costs at the vehicle's capacity, for the rate sheet
+        capacity = self.vehicle.capacity_liters if self.vehicle is not None else None
+        costs = calculated_costs(self.cost_per_load, capacity) if capacity else None
+        _set_calculated_costs(self, costs, kwargs)
+        super().save(*args, **kwargs)
 
 
 class RateHistoryVendor(models.Model):
@@ -129,6 +242,20 @@ class RateHistoryVendor(models.Model):
 
     class Meta:
         db_table = "rate_history_vendors"
+        indexes = [
+            models.Index(fields=["source", "water_type", "effective_date"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Per KL / per liter costs, read by pricing.py and the rate sheet
+        if self.cost_type == "Per_Liter":
+            costs = calculated_costs(self.rate_value, 1)
+        elif self.cost_type == "Per_Load" and self.vehicle_capacity:
+            costs = calculated_costs(self.rate_value, self.vehicle_capacity)
+        else:
+            costs = None
+        _set_calculated_costs(self, costs, kwargs)
+        super().save(*args, **kwargs)
 
 
 class RateHistoryPipeline(models.Model):
@@ -138,6 +265,9 @@ class RateHistoryPipeline(models.Model):
 
     class Meta:
         db_table = "rate_history_pipeline"
+        indexes = [
+            models.Index(fields=["source", "effective_date"]),
+        ]
 
 
 # 4. Transaction Model (Daily Entries)
@@ -151,6 +281,11 @@ class WaterEntry(models.Model):
         ("Drinking Water", "Drinking Water"),
         ("Normal Water (Salt)", "Normal Water (Salt)"),
     )
+    WATER_CATEGORY_CHOICES = (
+        ("Corporation Water", "Corporation Water"),
+        ("Drinking Water", "Drinking Water"),
+        ("Normal Water (Salt)", "Normal Water (Salt)"),
+    )
 
     entry_date = models.DateField()
     source = models.ForeignKey(
@@ -174,6 +309,10 @@ class WaterEntry(models.Model):
         max_length=20, choices=SHIFT_CHOICES, null=True, blank=True
     )
     water_type = models.CharField(max_length=50, null=True, blank=True)
+    # Derived from source type and water_type on save; used by reports
+    water_category = models.CharField(
+        max_length=50, choices=WATER_CATEGORY_CHOICES, null=True, blank=True
+    )
 
     vehicle = models.ForeignKey(
         MasterInternalVehicle, on_delete=models.SET_NULL, null=True, blank=True
@@ -205,6 +344,58 @@ class WaterEntry(models.Model):
 
     class Meta:
         db_table = "water_entries"
+        indexes = [
+            models.Index(fields=["water_category", "entry_date"]),
+            models.Index(fields=["-entry_date", "-created_at"]),
+            models.Index(fields=["source", "entry_date"]),
+        ]
+
+    @staticmethod
+    def category_for(source, water_type):
+        """Pipeline water is always Corporation Water; otherwise the water type."""
+        if source is not None and source.source_type == "Pipeline":
+            return "Corporation Water"
+        return water_type
+
+    def save(self, *args, **kwargs):
+        self.water_category = self.category_for(self.source, self.water_type)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "water_category" not in update_fields:
+            kwargs["update_fields"] = {*update_fields, "water_category"}
+        super().save(*args, **kwargs)
+
+
+class DailyWaterRollup(models.Model):
+    """
+    Pre-aggregated WaterEntry totals per day and dimension combination.
+    Kept in sync by rollups.refresh_daily_rollup whenever entries are written.
+    """
+    date = models.DateField(db_index=True)
+    water_category = models.CharField(
+        max_length=50, choices=WaterEntry.WATER_CATEGORY_CHOICES, null=True, blank=True
+    )
+    # Reports count Normal Water by water type, Pipeline entries included
+    water_type = models.CharField(max_length=50, null=True, blank=True)
+    source = models.ForeignKey(
+        MasterSource, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    loading_location = models.ForeignKey(
+        MasterLocation, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    unloading_location = models.ForeignKey(
+        MasterLocation, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    vehicle = models.ForeignKey(
+        MasterInternalVehicle, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    entry_count = models.IntegerField(default=0)
+    loads = models.IntegerField(null=True, blank=True)
+    liters = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "daily_water_rollups"
 
 
 # 5. Yield Tracking Models
@@ -240,6 +431,13 @@ class YieldEntry(models.Model):
     class Meta:
         db_table = "yield_entries"
         ordering = ['-date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=["location", "date"], name="unique_yield_entry_location_date"),
+        ]
+        indexes = [
+            models.Index(fields=["location", "-date", "-created_at"]),
+            models.Index(fields=["-date", "-created_at"]),
+        ]
 
 
 # 6. Consumption Tracking Models
@@ -293,3 +491,26 @@ class ConsumptionEntry(models.Model):
     class Meta:
         db_table = "consumption_entries"
         ordering = ['-date', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=["location", "date"], name="unique_consumption_entry_location_date"),
+        ]
+        indexes = [
+            models.Index(fields=["location", "-date", "-created_at"]),
+            models.Index(fields=["-date", "-created_at"]),
+        ]
+
+
+# 7. Cache Bookkeeping
+class DataVersion(models.Model):
+    """
+    Single-row counter bumped on every write that can change a report.
+    Cached report results are keyed by it, so a bump invalidates them all.
+    ``rates_version`` only moves on rate history writes; server processes
+    reload their in-memory rate index when it changes.
+    """
+    version = models.BigIntegerField(default=0)
+    rates_version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "data_version"
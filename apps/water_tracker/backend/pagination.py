@@ -1,5 +1,223 @@
-from rest_framework.pagination import LimitOffsetPagination
+import hashlib
+import json
+from base64 import b64decode, b64encode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import DataVersion
+from .report_cache import data_version
+
+
+ENTRY_COUNT_KEY = 'water_tracker:entry_count:{version}:{query}'
+
+# The data version (see report_cache.data_version), as a column of the page query
+PAGE_DATA_VERSION = Coalesce(
+    Subquery(DataVersion.objects.filter(pk=1).values('version')[:1]), Value(0)
+)
+
+
+def estimated_count(queryset):
+    """
+    The planner's row estimate for ``queryset`` (PostgreSQL only, else None).
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
 
 class StandardResultsSetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination whose total count is cached per filtered query
+    and data version, so paging through the same filters counts only once.
+    The page query reads the current data version along with the rows, so a
+    page whose count is cached costs a single query.
+
+    With ``ENTRY_COUNT_ESTIMATE_THRESHOLD`` set, a filtered set the planner
+    estimates above that size gets the estimate instead of an exact count;
+    ``count_is_exact`` in the response says which one was returned.
+    """
     default_limit = 10
     max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+
+        page = list(
+            queryset.annotate(page_data_version=PAGE_DATA_VERSION)[self.offset:self.offset + self.limit]
+        )
+        version = page[0].page_data_version if page else data_version(request)[0]
+        self.count, self.count_is_exact = self._cached_count(queryset, version)
+        if not self.count_is_exact:
+            # Never end the listing before the rows already seen
+            self.count = max(self.count, self.offset + len(page) + (len(page) == self.limit))
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return page
+
+    def _cached_count(self, queryset, version):
+        query = hashlib.sha256(str(queryset.order_by().query).encode()).hexdigest()
+        key = ENTRY_COUNT_KEY.format(version=version, query=query)
+        cached = cache.get(key)
+        if cached is None:
+            cached = self._count(queryset)
+            cache.set(key, cached, timeout=settings.ENTRY_COUNT_CACHE_TTL)
+        return cached
+
+    def _count(self, queryset):
+        threshold = settings.ENTRY_COUNT_ESTIMATE_THRESHOLD
+        if threshold is not None:
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate > threshold:
+                return estimate, False
+        return queryset.count(), True
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_is_exact': self.count_is_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_exact'] = {'type': 'boolean'}
+        return response_schema
+
+
+class EntryCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the viewset's default ordering: each page seeks
+    from the cursor position through the index instead of skipping the
+    earlier rows, and no COUNT(*) is run.
+
+    The cursor holds every field of the ordering (date, ``created_at``,
+    ``id``), so rows sharing a date or timestamp are neither skipped nor
+    repeated, and pages are selected by comparing all of them in order.
+    """
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = view.get_ordering()
+        if self.ordering != next(iter(view.orderings.values())):
+            raise ValidationError({'ordering': 'Cursor pagination only supports the default ordering.'})
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        model_fields = [queryset.model._meta.get_field(field) for field in self.fields]
+
+        reverse, position = self.decode_cursor(request, model_fields)
+        # Walking backwards flips the direction of every field
+        descending = self.ordering[0].startswith('-') != reverse
+        if position is not None:
+            queryset = queryset.filter(self._after(position, descending))
+        ordering = [f'-{field}' if descending else field for field in self.fields]
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def _after(self, position, descending):
+        """
+        Filter for the rows past ``position`` in the ordering, as
+        ``(a < x) | (a = x & b < y) | (a = x & b = y & c < z)`` (``>`` when
+        ascending). The leading ``a <= x`` bound lets the index seek.
+        """
+        lookup = 'lt' if descending else 'gt'
+        after = Q()
+        for index, field in enumerate(self.fields):
+            equal = dict(zip(self.fields[:index], position))
+            after |= Q(**equal, **{f'{field}__{lookup}': position[index]})
+        return Q(**{f'{self.fields[0]}__{lookup}e': position[0]}) & after
+
+    def _position(self, entry):
+        return [getattr(entry, field) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self._position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self._position(self.page[0]))
+
+    def encode_cursor(self, reverse, position):
+        token = json.dumps({'r': int(reverse), 'p': [str(value) for value in position]})
+        encoded = b64encode(token.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model_fields):
+        """
+        ``(reverse, position)`` of the request's cursor; ``(False, None)``
+        without one.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            token = json.loads(b64decode(encoded.encode()))
+            values = token['p']
+            if len(values) != len(model_fields):
+                raise ValueError
+            position = tuple(
+                model_field.to_python(value) for model_field, value in zip(model_fields, values)
+            )
+            return bool(token['r']), position
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class EntryOrderingMixin:
+    """
+    Entry viewset ordering and pagination.
+
+    ``orderings`` maps the accepted ``?ordering=`` values to the full, unique
+    ordering used for them; every one of them is backed by an index. The
+    first is the default and any other value is rejected.
+
+    ``?pagination=cursor`` opts in to ``EntryCursorPagination`` (default
+    ordering only); otherwise the viewset's ``pagination_class`` is used.
+    """
+    orderings = {}
+
+    def get_ordering(self):
+        ordering = self.request.query_params.get('ordering') or next(iter(self.orderings))
+        if ordering not in self.orderings:
+            raise ValidationError({'ordering': f"Must be one of: {', '.join(self.orderings)}"})
+        return self.orderings[ordering]
+
+    @property
+    def paginator(self):
+        request = self.request
+        if not hasattr(self, '_paginator') and request and request.query_params.get('pagination') == 'cursor':
+            self._paginator = EntryCursorPagination()
+        return super().paginator
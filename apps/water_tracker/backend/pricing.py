@@ -0,0 +1,291 @@
+"""
+Rate resolution for water entry costs.
+
+The rate in force for an entry is the latest rate history row of its key
+with ``effective_date`` on or before the entry date. ``rate_index`` keeps all
+rate history rows of the process in memory, grouped by key with sorted
+effective dates, so a lookup is a bisect instead of a database query:
+
+* internal vehicles: ``(vehicle_id, loading_location_id)``
+* vendors: ``(source_id, water_type)``
+* pipelines: ``source_id``
+
+Rate history writes in this process drop the index once they commit (see
+``signals.py``). Other server processes notice the change through
+``DataVersion.rates_version``, which is checked at most every
+``RATE_INDEX_CHECK_INTERVAL`` seconds.
+
+``calculate_cost`` prices one entry form line item against the index and
+``entry_cost_fields`` prices a water entry the same way.
+"""
+import bisect
+import operator
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+
+from .models import DataVersion, RateHistoryInternalVehicle, RateHistoryPipeline, RateHistoryVendor
+
+
+# Rate history model of each index table and the fields keying its rates
+# (WaterEntry has fields of the same names)
+RATE_TABLES = {
+    'internal': (RateHistoryInternalVehicle, ('vehicle_id', 'loading_location_id')),
+    'vendor': (RateHistoryVendor, ('source_id', 'water_type')),
+    'pipeline': (RateHistoryPipeline, ('source_id',)),
+}
+
+
+def _as_id(value):
+    return int(value) if value not in (None, '') else None
+
+
+def _group(rates, key):
+    """
+    ``{key: (effective_dates, rates)}`` with both tuples in date order. Rates
+    sharing a date keep the id order, so the newest row of the day wins.
+    """
+    grouped = {}
+    for rate in sorted(rates, key=lambda rate: (rate.effective_date, rate.id)):
+        grouped.setdefault(key(rate), []).append(rate)
+    return {
+        k: (tuple(rate.effective_date for rate in group), tuple(group))
+        for k, group in grouped.items()
+    }
+
+
+class RateIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._tables = None
+
+    def _rates_version(self):
+        return DataVersion.objects.filter(pk=1).values_list('rates_version', flat=True).first() or 0
+
+    def _load(self):
+        return {
+            table: _group(model.objects.all(), operator.attrgetter(*fields))
+            for table, (model, fields) in RATE_TABLES.items()
+        }
+
+    def _current(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._tables is None or now - self._checked_at >= settings.RATE_INDEX_CHECK_INTERVAL:
+                version = self._rates_version()
+                if self._tables is None or version != self._version:
+                    self._tables = self._load()
+                    self._version = version
+                self._checked_at = now
+            return self._tables
+
+    def _lookup(self, table, key, day):
+        dates, rates = self._current()[table].get(key, ((), ()))
+        position = bisect.bisect_right(dates, day)
+        return rates[position - 1] if position else None
+
+    def window(self, rate):
+        """
+        ``(first, last)`` entry dates priced at the rate history row ``rate``;
+        ``last`` is None while no later row of its key exists.
+        """
+        table, fields = next(
+            (table, fields) for table, (model, fields) in RATE_TABLES.items()
+            if isinstance(rate, model)
+        )
+        dates, _ = self._current()[table].get(operator.attrgetter(*fields)(rate), ((), ()))
+        position = bisect.bisect_right(dates, rate.effective_date)
+        if position < len(dates):
+            return rate.effective_date, dates[position] - timedelta(days=1)
+        return rate.effective_date, None
+
+    def internal_vehicle_rate(self, vehicle_id, loading_location_id, day):
+        return self._lookup('internal', (_as_id(vehicle_id), _as_id(loading_location_id)), day)
+
+    def vendor_rate(self, source_id, water_type, day):
+        return self._lookup('vendor', (_as_id(source_id), water_type), day)
+
+    def pipeline_rate(self, source_id, day):
+        return self._lookup('pipeline', _as_id(source_id), day)
+
+
+rate_index = RateIndex()
+
+
+# Pricing rule of each MasterSource.source_type
+SOURCE_PRICING = {
+    "Internal_Bore": "internal",
+    "Internal_Well": "internal",
+    "Pipeline": "pipeline",
+    "Vendor": "vendor",
+}
+
+ENTRY_COST_FIELDS = (
+    "total_cost",
+    "snapshot_cost_per_liter",
+    "snapshot_cost_per_kl",
+    "snapshot_paise_per_liter",
+)
+
+
+def _price(source_type, source_id, vehicle_id, loading_location_id, water_type,
+           quantity_liters, load_count, is_manual_override, entry_date, rates):
+    """
+    Unrounded cost of ``quantity_liters`` (a Decimal, in liters) at the rate in
+    force on ``entry_date``, or None when no rate applies.
+    """
+    if source_type == "internal":
+        # Get vehicle rate based on vehicle AND loading_location
+        vehicle_rate = rates.internal_vehicle_rate(vehicle_id, loading_location_id, entry_date)
+
+        if vehicle_rate:
+            cost_per_load = Decimal(str(vehicle_rate.cost_per_load))
+            return cost_per_load * Decimal(int(load_count))
+
+    elif source_type == "vendor":
+        # Get vendor rate
+        vendor_rate = rates.vendor_rate(source_id, water_type, entry_date)
+
+        if vendor_rate:
+            # OPTIMIZATION: If Per_Load, calculate directly: Rate * Load Count to avoid precision loss
+            # BUT ONLY IF NOT manual override
+            if vendor_rate.cost_type == "Per_Load" and not is_manual_override:
+                return Decimal(str(vendor_rate.rate_value)) * Decimal(str(load_count))
+
+            # Otherwise use stored calculated cost per KL (Partial Loads / Per Liter)
+            if vendor_rate.calculated_cost_per_kl:
+                cost_per_kl = Decimal(str(vendor_rate.calculated_cost_per_kl))
+                return (quantity_liters / Decimal("1000")) * cost_per_kl
+
+            # Fallback calculation
+            cost_per_kl = Decimal("0")
+            if vendor_rate.cost_type == "Per_Liter":
+                cost_per_kl = Decimal(str(vendor_rate.rate_value)) * Decimal("1000")
+            elif vendor_rate.cost_type == "Per_Load" and vendor_rate.vehicle_capacity:
+                cost_per_kl = (
+                    Decimal(str(vendor_rate.rate_value))
+                    / Decimal(str(vendor_rate.vehicle_capacity))
+                ) * Decimal("1000")
+
+            return (quantity_liters / Decimal("1000")) * cost_per_kl
+
+    elif source_type == "pipeline":
+        # Get pipeline rate
+        pipeline_rate = rates.pipeline_rate(source_id, entry_date)
+
+        if pipeline_rate:
+            return quantity_liters * Decimal(str(pipeline_rate.cost_per_liter))
+
+    return None
+
+
+def _paise(amount):
+    # Round to 2 decimal places for display
+    return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def calculate_cost(item, rates=rate_index):
+    """
+    Cost of one line item with the ``calculate-cost`` request fields
+    (``source_type``, ``source_id``, ``vehicle_id``, ``loading_location_id``,
+    ``water_type``, ``quantity_liters``, ``load_count``, ``is_manual_override``,
+    ``entry_date``), rounded half-up to paise.
+    """
+    source_type = item.get("source_type")
+    entry_date_str = item.get("entry_date")
+
+    if not entry_date_str:
+        raise ValueError("entry_date is required")
+
+    quantity_liters = Decimal(str(float(item.get("quantity_liters", 0))))
+    if source_type == "pipeline":
+        # Pipeline meter readings are in KL, convert to liters (* 1000)
+        quantity_liters *= Decimal("1000")
+
+    total_cost = _price(
+        source_type,
+        item.get("source_id"),
+        item.get("vehicle_id"),
+        item.get("loading_location_id"),
+        item.get("water_type", "Drinking Water"),
+        quantity_liters,
+        item.get("load_count", 1),
+        item.get("is_manual_override", False),
+        datetime.strptime(entry_date_str, "%Y-%m-%d").date(),
+        rates,
+    )
+    return _paise(total_cost if total_cost is not None else Decimal("0"))
+
+
+# WaterEntry values() an entry is priced from
+ENTRY_PRICING_VALUES = [
+    "source__source_type",
+    "source_id",
+    "vehicle_id",
+    "loading_location_id",
+    "water_type",
+    "total_quantity_liters",
+    "load_count",
+    "manual_capacity_liters",
+    "entry_date",
+]
+
+
+def entry_cost_fields(entry, rates=rate_index):
+    """
+    ``ENTRY_COST_FIELDS`` values for a ``WaterEntry`` (saved or not), priced
+    like its ``calculate-cost`` request from the entry form: the total cost at
+    the rate in force on ``entry_date`` and the effective per liter, per KL
+    and paise per liter rates it works out to. Pipeline quantities are
+    already in liters here. Without an applicable rate the cost is zero and
+    the snapshots are left empty.
+    """
+    row = {field: getattr(entry, field) for field in ENTRY_PRICING_VALUES[1:]}
+    row["source__source_type"] = entry.source.source_type if entry.source is not None else None
+    return row_cost_fields(row, rates)
+
+
+def row_cost_fields(row, rates=rate_index):
+    """
+    ``entry_cost_fields`` of a ``values()`` row with the ``ENTRY_PRICING_VALUES``
+    keys, for pricing many entries without building model instances.
+    """
+    if row["source__source_type"] is not None:
+        source_type = SOURCE_PRICING.get(row["source__source_type"], "vendor")
+    else:
+        # Internal vehicle trips without an internal source are still priced per load
+        source_type = "internal" if row["vehicle_id"] else "vendor"
+    quantity_liters = Decimal(str(row["total_quantity_liters"] or 0))
+    total_cost = _price(
+        source_type,
+        row["source_id"],
+        row["vehicle_id"],
+        row["loading_location_id"],
+        row["water_type"] or "Drinking Water",
+        quantity_liters,
+        row["load_count"] or 1,
+        # The entry form switches to a manual capacity for manual overrides
+        row["manual_capacity_liters"] is not None,
+        row["entry_date"],
+        rates,
+    )
+
+    if total_cost is None or not quantity_liters:
+        return dict(zip(ENTRY_COST_FIELDS, (_paise(total_cost or Decimal("0")), None, None, None)))
+
+    cost_per_liter = total_cost / quantity_liters
+    return {
+        "total_cost": _paise(total_cost),
+        "snapshot_cost_per_liter": cost_per_liter.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP),
+        "snapshot_cost_per_kl": _paise(cost_per_liter * Decimal("1000")),
+        "snapshot_paise_per_liter": _paise(cost_per_liter * Decimal("100")),
+    }
@@ -0,0 +1,133 @@
+"""
+Result cache for the report endpoints.
+
+A report response is cached under its endpoint, its normalized query
+parameters, the current data version and today's date (several reports
+default to "today" or the current month or year). Every write that can change a
+report bumps the version (``signals.py`` for model saves and deletes, explicit
+``bump_data_version`` calls for bulk writes that skip signals), so stale
+results are never served; they simply stop being read and age out of the
+``reports`` cache, which bounds them by TTL and entry count.
+"""
+import functools
+import hashlib
+import json
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import DataVersion
+
+
+REPORT_CACHE_ALIAS = 'reports'
+REPORT_KEY = 'water_tracker:report:{version}:{today}:{endpoint}:{params}'
+STATS_KEYS = {
+    'hits': 'water_tracker:report_cache:hits',
+    'misses': 'water_tracker:report_cache:misses',
+}
+
+
+def data_version(request=None):
+    """
+    ``(version, updated_at)`` of the report data. Given a ``request``, the row
+    is read once and reused for the rest of that request.
+    """
+    if request is not None and hasattr(request, '_data_version'):
+        return request._data_version
+    state = DataVersion.objects.filter(pk=1).values_list('version', 'updated_at').first() or (0, None)
+    if request is not None:
+        request._data_version = state
+    return state
+
+
+def bump_data_version(rates=False):
+    """
+    Increment the data version, and the rates version too for rate history
+    writes. Runs inside the caller's transaction, so the bump is rolled back
+    together with the write that caused it.
+    """
+    changes = {'version': F('version') + 1}
+    if rates:
+        changes['rates_version'] = F('rates_version') + 1
+    updated = DataVersion.objects.filter(pk=1).update(updated_at=timezone.now(), **changes)
+    if not updated:
+        DataVersion.objects.get_or_create(pk=1, defaults={'version': 1, 'rates_version': int(rates)})
+
+
+def normalize_params(query_params, url_kwargs):
+    """
+    Stable digest of the request parameters: keys sorted, blank values
+    dropped (the report views treat them as missing).
+    """
+    params = {
+        key: sorted(value for value in query_params.getlist(key) if value != '')
+        for key in query_params
+    }
+    params = {key: values for key, values in params.items() if values}
+    params.update({key: [str(value)] for key, value in url_kwargs.items()})
+    encoded = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _count(outcome):
+    cache = caches[REPORT_CACHE_ALIAS]
+    key = STATS_KEYS[outcome]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """
+    Hit/miss counters of the report cache. They live in the cache itself, so
+    they are per process with the default local-memory backend and shared
+    across workers with a shared backend.
+    """
+    cache = caches[REPORT_CACHE_ALIAS]
+    counts = cache.get_many(STATS_KEYS.values())
+    hits = counts.get(STATS_KEYS['hits'], 0)
+    misses = counts.get(STATS_KEYS['misses'], 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        'data_version': data_version()[0],
+        'timeout': settings.CACHES[REPORT_CACHE_ALIAS].get('TIMEOUT'),
+        'max_entries': settings.CACHES[REPORT_CACHE_ALIAS].get('OPTIONS', {}).get('MAX_ENTRIES'),
+    }
+
+
+def cached_report(get):
+    """
+    Decorator for a report view's ``get``: serve the response data from the
+    report cache, computing and storing it on a miss. Only successful
+    responses are cached.
+    """
+    @functools.wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        cache = caches[REPORT_CACHE_ALIAS]
+        key = REPORT_KEY.format(
+            version=data_version(request)[0],
+            today=date.today().isoformat(),
+            endpoint=type(self).__name__,
+            params=normalize_params(request.query_params, kwargs),
+        )
+        data = cache.get(key)
+        if data is not None:
+            _count('hits')
+            return Response(data)
+
+        _count('misses')
+        response = get(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        return response
+
+    return wrapper
@@ -0,0 +1,245 @@
+"""
+Shared aggregation helpers for the report endpoints.
+
+Water purchase reports read from DailyWaterRollup (see rollups.py), so their
+cost scales with the number of days rather than the number of entries.
+Every report splits its totals into the same three water categories; the
+helpers below compute all of them in a single conditional aggregation query
+(SUM ... FILTER / CASE WHEN on SQLite) instead of one query per category.
+"""
+from decimal import Decimal
+
+from django.db.models import F, Min, Q, Sum, Window
+from django.db.models.functions import Coalesce, NullIf, RowNumber, TruncMonth, TruncYear
+
+
+WATER_CATEGORIES = ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']
+
+# (result key prefix, rollup condition) for each water category. Normal Water
+# is counted by water type, so Pipeline entries of that type appear under both
+# Corporation and Normal, as the reports always have.
+WATER_CATEGORY_FILTERS = {
+    'Corporation Water': ('corporation', Q(water_category='Corporation Water')),
+    'Drinking Water': ('drinking', Q(water_category='Drinking Water')),
+    'Normal Water (Salt)': ('normal', Q(water_type='Normal Water (Salt)')),
+}
+
+# Loads per entry, counting a missing or zero load count as one load
+LOAD_COUNT = Coalesce(NullIf(F('load_count'), 0), 1)
+
+BUCKET_EXPRESSIONS = {
+    'day': F('date'),
+    'month': TruncMonth('date'),
+    'year': TruncYear('date'),
+}
+
+
+def category_aggregates():
+    """
+    Aggregate kwargs over DailyWaterRollup rows for ``total_entries``,
+    ``total_loads``, ``total_liters`` and ``total_cost`` plus entries, liters
+    and cost per water category (``<category>_liters`` etc.), suitable for
+    ``.aggregate()`` or ``.values().annotate()``.
+    """
+    aggregates = {
+        'total_entries': Sum('entry_count'),
+        'total_loads': Sum('loads'),
+        'total_liters': Sum('liters'),
+        'total_cost': Sum('cost'),
+    }
+    for prefix, condition in WATER_CATEGORY_FILTERS.values():
+        aggregates[f'{prefix}_entries'] = Sum('entry_count', filter=condition)
+        aggregates[f'{prefix}_liters'] = Sum('liters', filter=condition)
+        aggregates[f'{prefix}_cost'] = Sum('cost', filter=condition)
+    return aggregates
+
+
+def liters_to_kl(liters):
+    return float((liters or Decimal('0')) / Decimal('1000'))
+
+
+def format_breakdown(row):
+    """
+    Build the ``{category: {'total_kl', 'total_cost'}}`` dict used by reports
+    from a row produced with ``category_aggregates()``.
+    """
+    breakdown = {}
+    for water_type in WATER_CATEGORIES:
+        prefix, _ = WATER_CATEGORY_FILTERS[water_type]
+        breakdown[water_type] = {
+            'total_kl': liters_to_kl(row[f'{prefix}_liters']),
+            'total_cost': float(row[f'{prefix}_cost'] or 0),
+        }
+    return breakdown
+
+
+def sum_rows(rows):
+    """
+    Combine bucket rows into a single row, keeping ``None`` for sums that had
+    no values (mirrors SQL SUM semantics).
+    """
+    keys = category_aggregates().keys()
+    totals = dict.fromkeys(keys)
+    for row in rows:
+        for key in keys:
+            if row[key] is not None:
+                totals[key] = row[key] if totals[key] is None else totals[key] + row[key]
+    return totals
+
+
+def format_summary(row):
+    return {
+        'total_loads': row['total_loads'] or 0,
+        'total_kl': liters_to_kl(row['total_liters']),
+        'total_cost': float(row['total_cost'] or 0),
+        'breakdown': format_breakdown(row),
+    }
+
+
+def bucketed_totals(rollups, bucket):
+    """
+    Group ``rollups`` by ``bucket`` ('day', 'month' or 'year') in one query.
+
+    Returns ``(rows, summary_row)`` where every row carries ``bucket`` plus the
+    ``category_aggregates()`` keys and the summary is the sum of all rows.
+    """
+    rows = list(
+        rollups.annotate(bucket=BUCKET_EXPRESSIONS[bucket])
+        .values('bucket')
+        .annotate(**category_aggregates())
+        .order_by('bucket')
+    )
+    return rows, sum_rows(rows)
+
+
+def totals_by(queryset, field, **aggregates):
+    """
+    Run ``aggregates`` grouped by ``field`` in one query and return them as a
+    dict keyed by the field value, for joining back to master tables.
+    """
+    rows = queryset.order_by().values(field).annotate(**aggregates)
+    return {row[field]: row for row in rows}
+
+
+def location_day_matrix(entries, value_field, locations, value_key, sparse=False):
+    """
+    Pivot meter entries into a date x location matrix from one
+    ``(date, location_id, SUM(value_field))`` query.
+
+    Returns ``(daily_data, summary)`` in the shape used by the daily yield and
+    consumption reports. ``locations`` decides which columns are shown; day
+    totals still include every location. With ``sparse=True`` each day's
+    breakdown only lists locations that have an entry on that day.
+    """
+    rows = (
+        entries.order_by()
+        .values('date', 'location_id')
+        .annotate(total_liters=Sum(value_field))
+        .order_by('date')
+    )
+
+    days = {}
+    for row in rows:
+        days.setdefault(row['date'], {})[row['location_id']] = row['total_liters'] or 0
+
+    location_totals = {loc.id: 0 for loc in locations}
+    daily_data = []
+    for day, values in days.items():
+        breakdown = {}
+        for loc in locations:
+            if loc.id in values:
+                location_totals[loc.id] += values[loc.id]
+            elif sparse:
+                continue
+            breakdown[loc.location_name] = {value_key: liters_to_kl(values.get(loc.id, 0))}
+
+        daily_data.append({
+            'date': str(day),
+            'total_kl': liters_to_kl(sum(values.values())),
+            'breakdown': breakdown,
+        })
+
+    summary = {
+        'total_kl': liters_to_kl(sum(sum(values.values()) for values in days.values())),
+        'breakdown': {
+            loc.location_name: {'total_kl': liters_to_kl(location_totals[loc.id])}
+            for loc in locations
+        },
+    }
+    return daily_data, summary
+
+
+def load_size_aggregates(prefix, condition=None):
+    """
+    Aggregate kwargs over WaterEntry rows for liters, amount and 12KL / 6KL
+    load counts (``<prefix>_12kl`` etc.), optionally limited to ``condition``.
+
+    An entry's loads count as 12KL when its average load is at least 10,000
+    liters and as 6KL when it is at least 4,000 liters.
+    """
+    def both(extra):
+        return extra if condition is None else condition & extra
+
+    return {
+        f'{prefix}_liters': Sum('total_quantity_liters', filter=condition),
+        f'{prefix}_amount': Sum('total_cost', filter=condition),
+        f'{prefix}_12kl': Sum(
+            LOAD_COUNT, filter=both(Q(total_quantity_liters__gte=LOAD_COUNT * 10000))
+        ),
+        f'{prefix}_6kl': Sum(
+            LOAD_COUNT,
+            filter=both(
+                Q(total_quantity_liters__gte=LOAD_COUNT * 4000)
+                & Q(total_quantity_liters__lt=LOAD_COUNT * 10000)
+            ),
+        ),
+        # Earliest entry id, a stable tie-break for sites with equal amounts
+        f'{prefix}_first': Min('id', filter=condition),
+    }
+
+
+def site_breakdown(rows, prefix):
+    """
+    Fold rows grouped by unloading location (and optionally day) carrying
+    ``load_size_aggregates(prefix)`` into the per-site list used by the
+    dashboard breakdown tables, largest amount first.
+    """
+    sites = {}
+    for row in rows:
+        if row[f'{prefix}_first'] is None:
+            continue
+        location_id = row['unloading_location_id']
+        site = sites.setdefault(location_id, {
+            'location': row['unloading_location__location_name'] or 'Unknown',
+            'location_id': location_id,
+            'count_12kl': 0,
+            'count_6kl': 0,
+            'total_liters': 0,
+            'total_amount': 0,
+            'first': row[f'{prefix}_first'],
+        })
+        site['count_12kl'] += row[f'{prefix}_12kl'] or 0
+        site['count_6kl'] += row[f'{prefix}_6kl'] or 0
+        site['total_liters'] += float(row[f'{prefix}_liters'] or 0)
+        site['total_amount'] += float(row[f'{prefix}_amount'] or 0)
+        site['first'] = min(site['first'], row[f'{prefix}_first'])
+
+    breakdown = sorted(sites.values(), key=lambda site: (-site['total_amount'], site['first']))
+    for site in breakdown:
+        del site['first']
+    return breakdown
+
+
+def latest_rates(rates, *key):
+    """
+    The latest row of every ``key`` combination in the rate history queryset
+    ``rates`` (the newest row wins on the same effective date, as in
+    pricing.py), in a single window-function query.
+    """
+    return rates.annotate(
+        recency=Window(
+            RowNumber(),
+            partition_by=[F(field) for field in key],
+            order_by=[F('effective_date').desc(), F('id').desc()],
+        )
+    ).filter(recency=1)
@@ -1,15 +1,21 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Sum, Count, Avg
-from django.db.models.functions import TruncMonth, TruncYear
+from django.db.models import Q, Sum
 from datetime import datetime
 from decimal import Decimal
 from .models import (
-    WaterEntry, MasterSource, MasterInternalVehicle, MasterLocation,
+    WaterEntry, DailyWaterRollup, LocationGroup, MasterSource, MasterInternalVehicle, MasterLocation,
     RateHistoryVendor, RateHistoryInternalVehicle, RateHistoryPipeline,
     YieldEntry, YieldLocation, ConsumptionEntry, ConsumptionLocation
 )
+from .conditional import conditional_method
+from .report_cache import cache_stats, cached_report
+from .repricing import audit_costs
+from .report_engine import (
+    WATER_CATEGORY_FILTERS, bucketed_totals, category_aggregates, format_breakdown, format_summary,
+    latest_rates, liters_to_kl, load_size_aggregates, location_day_matrix, site_breakdown, totals_by
+)
 
 
 class MonthlySummaryReportView(APIView):
@@ -17,112 +23,38 @@ class MonthlySummaryReportView(APIView):
     Monthly Summary Report - Date-wise breakdown grouped by month
     Query params: ?start_date=2024-01-01&end_date=2024-12-31
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            # Group by month
-            monthly_aggregates = entries.annotate(
-                month=TruncMonth('entry_date')
-            ).values('month').annotate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            ).order_by('month')
+            # Group by month, with the per-category breakdown in the same query
+            monthly_aggregates, overall_summary = bucketed_totals(rollups, 'month')
 
             result_data = []
             
             for item in monthly_aggregates:
-                month_entries = entries.filter(
-                    entry_date__month=item['month'].month,
-                    entry_date__year=item['month'].year
-                )
-                
-                # Breakdown for this month
-                month_breakdown = {}
-                for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                    if water_type == 'Corporation Water':
-                        type_data = month_entries.filter(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    elif water_type == 'Drinking Water':
-                        type_data = month_entries.filter(
-                            water_type='Drinking Water'
-                        ).exclude(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    else:
-                        type_data = month_entries.filter(water_type=water_type).aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    
-                    month_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                    month_breakdown[water_type] = {
-                        'total_kl': float(month_total_kl),
-                        'total_cost': float(type_data['total_cost'] or 0)
-                    }
-
-                total_kl = (item['total_liters'] or Decimal('0')) / Decimal('1000')
                 result_data.append({
-                    'month': item['month'].strftime('%Y-%m'),
-                    'month_name': item['month'].strftime('%B %Y'),
+                    'month': item['bucket'].strftime('%Y-%m'),
+                    'month_name': item['bucket'].strftime('%B %Y'),
                     'loads': item['total_loads'],
-                    'total_kl': float(total_kl),
+                    'total_kl': liters_to_kl(item['total_liters']),
                     'total_cost': float(item['total_cost'] or 0),
-                    'breakdown': month_breakdown
+                    'breakdown': format_breakdown(item)
                 })
 
-            # Overall Summary for the selected period
-            overall_summary = entries.aggregate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            overall_total_kl = (overall_summary['total_liters'] or Decimal('0')) / Decimal('1000')
-            
-            overall_breakdown = {}
-            for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                if water_type == 'Corporation Water':
-                     type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                
-                overall_type_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                overall_breakdown[water_type] = {
-                    'total_kl': float(overall_type_total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0)
-                }
-
             result = {
                 'monthly_data': result_data,
-                'summary': {
-                    'total_loads': overall_summary['total_loads'] or 0,
-                    'total_kl': float(overall_total_kl),
-                    'total_cost': float(overall_summary['total_cost'] or 0),
-                    'breakdown': overall_breakdown
-                }
+                'summary': format_summary(overall_summary)
             }
             
             return Response(result)
@@ -136,104 +68,37 @@ class DailyMovementReportView(APIView):
     Daily Water Movement Report - Date-wise breakdown
     Query params: ?start_date=2024-02-01&end_date=2024-02-28
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            # Group by date
-            daily_data = entries.values('entry_date').annotate(
-                loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            ).order_by('entry_date')
+            # Group by date, with the per-category breakdown in the same query
+            daily_data, overall_summary = bucketed_totals(rollups, 'day')
             
             result_data = []
             
             for item in daily_data:
-                day_entries = entries.filter(entry_date=item['entry_date'])
-                
-                # Breakdown for this day
-                day_breakdown = {}
-                for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                    if water_type == 'Corporation Water':
-                         type_data = day_entries.filter(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    elif water_type == 'Drinking Water':
-                        type_data = day_entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    else:
-                        type_data = day_entries.filter(water_type=water_type).aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    
-                    day_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                    day_breakdown[water_type] = {
-                        'total_kl': float(day_total_kl),
-                        'total_cost': float(type_data['total_cost'] or 0)
-                    }
-
-                total_kl = (item['total_liters'] or Decimal('0')) / Decimal('1000')
                 result_data.append({
-                    'date': str(item['entry_date']),
-                    'loads': item['loads'],
-                    'total_kl': float(total_kl),
+                    'date': str(item['bucket']),
+                    'loads': item['total_loads'],
+                    'total_kl': liters_to_kl(item['total_liters']),
                     'total_cost': float(item['total_cost'] or 0),
-                    'breakdown': day_breakdown
+                    'breakdown': format_breakdown(item)
                 })
 
-            # Overall Summary for the selected period
-            overall_summary_data = entries.aggregate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            overall_summary_data['total_kl'] = (overall_summary_data['total_liters'] or Decimal('0')) / Decimal('1000')
-            
-            overall_breakdown = {}
-            for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                if water_type == 'Corporation Water':
-                     type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                
-                overall_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                overall_breakdown[water_type] = {
-                    'total_kl': float(overall_total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0)
-                }
-
             response_payload = {
                 'daily_data': result_data,
-                'summary': {
-                    'total_loads': overall_summary_data['total_loads'] or 0,
-                    'total_kl': float(overall_summary_data['total_kl'] or 0),
-                    'total_cost': float(overall_summary_data['total_cost'] or 0),
-                    'breakdown': overall_breakdown
-                }
+                'summary': format_summary(overall_summary)
             }
             
             return Response(response_payload)
@@ -247,6 +112,8 @@ class YearlyTrendReportView(APIView):
     Yearly Trend Report - Year-wise aggregates for a range of years
     Query params: ?start_year=2021&end_year=2026
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_year = request.query_params.get('start_year')
@@ -259,106 +126,30 @@ class YearlyTrendReportView(APIView):
                 if not end_year:
                     end_year = str(end_year_val)
 
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_year:
-                entries = entries.filter(entry_date__year__gte=start_year)
+                rollups = rollups.filter(date__year__gte=start_year)
             if end_year:
-                entries = entries.filter(entry_date__year__lte=end_year)
+                rollups = rollups.filter(date__year__lte=end_year)
             
-            # Group by year
-            yearly_aggregates = entries.annotate(
-                year=TruncYear('entry_date')
-            ).values('year').annotate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            ).order_by('year')
+            # Group by year, with the per-category breakdown in the same query
+            yearly_aggregates, overall_summary = bucketed_totals(rollups, 'year')
 
             result_data = []
             
             for item in yearly_aggregates:
-                year_val = item['year'].year
-                year_entries = entries.filter(entry_date__year=year_val)
-                
-                # Breakdown for this year
-                year_breakdown = {}
-                for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                    if water_type == 'Corporation Water':
-                        type_data = year_entries.filter(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    elif water_type == 'Drinking Water':
-                        type_data = year_entries.filter(
-                            water_type='Drinking Water'
-                        ).exclude(source__source_type='Pipeline').aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    else:
-                        type_data = year_entries.filter(water_type=water_type).aggregate(
-                            total_liters=Sum('total_quantity_liters'),
-                            total_cost=Sum('total_cost')
-                        )
-                    
-                    year_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                    year_breakdown[water_type] = {
-                        'total_kl': float(year_total_kl),
-                        'total_cost': float(type_data['total_cost'] or 0)
-                    }
-
-                total_kl = (item['total_liters'] or Decimal('0')) / Decimal('1000')
                 result_data.append({
-                    'year': year_val,
+                    'year': item['bucket'].year,
                     'loads': item['total_loads'] or 0,
-                    'total_kl': float(total_kl),
+                    'total_kl': liters_to_kl(item['total_liters']),
                     'total_cost': float(item['total_cost'] or 0),
-                    'breakdown': year_breakdown
+                    'breakdown': format_breakdown(item)
                 })
 
-            # Overall Summary for the selected period
-            overall_summary_data = entries.aggregate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            overall_total_kl = (overall_summary_data['total_liters'] or Decimal('0')) / Decimal('1000')
-            
-            overall_breakdown = {}
-            for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                if water_type == 'Corporation Water':
-                     type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(
-                        water_type='Drinking Water'
-                    ).exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                
-                overall_type_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                overall_breakdown[water_type] = {
-                    'total_kl': float(overall_type_total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0)
-                }
-
             result = {
                 'yearly_data': result_data,
-                'summary': {
-                    'total_loads': overall_summary_data['total_loads'] or 0,
-                    'total_kl': float(overall_total_kl),
-                    'total_cost': float(overall_summary_data['total_cost'] or 0),
-                    'breakdown': overall_breakdown
-                }
+                'summary': format_summary(overall_summary)
             }
             
             return Response(result)
@@ -372,45 +163,29 @@ class WaterTypeConsumptionReportView(APIView):
     Water Type Consumption Report - Drinking vs Normal Water (Salt)
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            # Group by water type
+            # All water types from one conditional aggregation
+            type_totals = rollups.aggregate(**category_aggregates())
             by_water_type = {}
             for water_type in ['Drinking Water', 'Normal Water (Salt)', 'Corporation Water']:
-                if water_type == 'Corporation Water':
-                    type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                
-                total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
+                prefix, _ = WATER_CATEGORY_FILTERS[water_type]
                 by_water_type[water_type] = {
-                    'total_kl': float(total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0),
-                    'loads': type_data['loads'] or 0
+                    'total_kl': liters_to_kl(type_totals[f'{prefix}_liters']),
+                    'total_cost': float(type_totals[f'{prefix}_cost'] or 0),
+                    'loads': type_totals[f'{prefix}_entries'] or 0
                 }
             
             return Response(by_water_type)
@@ -424,77 +199,46 @@ class VendorUsageReportView(APIView):
     Vendor Usage Report - Loads per vendor and amounts paid
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            # Get vendor usage data
+            # Get vendor usage data (one grouped query, joined to vendors in memory)
             vendor_sources = MasterSource.objects.filter(source_type='Vendor')
+            vendor_totals = totals_by(
+                rollups, 'source_id',
+                loads=Sum('entry_count'),
+                total_liters=Sum('liters'),
+                total_cost=Sum('cost')
+            )
             vendor_data_list = []
             for vendor in vendor_sources:
-                vendor_data = entries.filter(source=vendor).aggregate(
-                    loads=Count('id'),
-                    total_liters=Sum('total_quantity_liters'),
-                    total_cost=Sum('total_cost')
-                )
+                vendor_data = vendor_totals.get(vendor.id, {})
                 
-                vendor_total_kl = (vendor_data['total_liters'] or Decimal('0')) / Decimal('1000')
                 vendor_data_list.append({
                     'vendor_id': vendor.id,
                     'vendor_name': vendor.source_name,
-                    'loads': vendor_data['loads'] or 0,
-                    'total_kl': float(vendor_total_kl),
-                    'total_cost': float(vendor_data['total_cost'] or 0)
+                    'loads': vendor_data.get('loads') or 0,
+                    'total_kl': liters_to_kl(vendor_data.get('total_liters')),
+                    'total_cost': float(vendor_data.get('total_cost') or 0)
                 })
 
             # Overall summary for selected period
-            summary = entries.aggregate(
-                total_loads=Sum('load_count'),
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            summary['total_kl'] = (summary['total_liters'] or Decimal('0')) / Decimal('1000')
-            
-            by_water_type = {}
-            for water_type in ['Corporation Water', 'Drinking Water', 'Normal Water (Salt)']:
-                if water_type == 'Corporation Water':
-                    type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost')
-                    )
-                
-                type_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
-                by_water_type[water_type] = {
-                    'total_kl': float(type_total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0)
-                }
+            summary = rollups.aggregate(**category_aggregates())
 
             response_payload = {
                 'vendor_data': vendor_data_list,
-                'summary': {
-                    'total_loads': summary['total_loads'] or 0,
-                    'total_kl': float(summary['total_kl'] or 0),
-                    'total_cost': float(summary['total_cost'] or 0),
-                    'breakdown': by_water_type
-                }
+                'summary': format_summary(summary)
             }
             
             return Response(response_payload)
@@ -508,38 +252,39 @@ class VehicleUtilizationReportView(APIView):
     Own Vehicle Utilization Report - Internal vehicle trips, KL transported, costs
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.filter(source__isnull=True)  # Internal entries
+            rollups = DailyWaterRollup.objects.filter(source__isnull=True)  # Internal entries
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
             # Get all internal vehicles
             vehicles = MasterInternalVehicle.objects.all()
+            vehicle_totals = totals_by(
+                rollups, 'vehicle_id',
+                trips=Sum('entry_count'),
+                total_liters=Sum('liters'),
+                total_cost=Sum('cost')
+            )
             
             result = []
             for vehicle in vehicles:
-                vehicle_data = entries.filter(vehicle=vehicle).aggregate(
-                    trips=Count('id'),
-                    total_liters=Sum('total_quantity_liters'),
-                    total_cost=Sum('total_cost')
-                )
-                
-                loads = vehicle_data['trips'] or 0
-                total_kl = float((vehicle_data['total_liters'] or Decimal('0')) / Decimal('1000'))
+                vehicle_data = vehicle_totals.get(vehicle.id, {})
                 
                 result.append({
                     'vehicle_id': vehicle.id,
                     'vehicle_name': vehicle.vehicle_name,
-                    'loads': loads,
-                    'total_kl': total_kl,
-                    'total_cost': float(vehicle_data['total_cost'] or 0)
+                    'loads': vehicle_data.get('trips') or 0,
+                    'total_kl': liters_to_kl(vehicle_data.get('total_liters')),
+                    'total_cost': float(vehicle_data.get('total_cost') or 0)
                 })
             
             return Response(result)
@@ -553,66 +298,43 @@ class CostComparisonReportView(APIView):
     Own vs Vendor Cost Comparison - Cost per KL comparison
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            result = {}
-            
-            # Vendor data
-            vendor_sources = MasterSource.objects.filter(source_type='Vendor').values_list('id', flat=True)
-            vendor_data = entries.filter(source_id__in=vendor_sources).aggregate(
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            vendor_kl = float((vendor_data['total_liters'] or Decimal('0')) / Decimal('1000'))
-            vendor_cost = float(vendor_data['total_cost'] or 0)
-            cost_per_kl = round(vendor_cost / vendor_kl, 2) if vendor_kl > 0 else 0
-            result['vendor'] = {
-                'total_kl': vendor_kl,
-                'total_cost': vendor_cost,
-                'cost_per_kl': cost_per_kl,
-                'cost_per_liter': round(Decimal(str(cost_per_kl)) / Decimal('1000'), 4) if cost_per_kl > 0 else 0
-            }
-            
-            # Rathinam vehicle data
-            rathinam_data = entries.filter(source__isnull=True).aggregate(
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            rathinam_kl = float((rathinam_data['total_liters'] or Decimal('0')) / Decimal('1000'))
-            rathinam_cost = float(rathinam_data['total_cost'] or 0)
-            cost_per_kl = round(rathinam_cost / rathinam_kl, 2) if rathinam_kl > 0 else 0
-            result['rathinam_vehicles'] = {
-                'total_kl': rathinam_kl,
-                'total_cost': rathinam_cost,
-                'cost_per_kl': cost_per_kl,
-                'cost_per_liter': round(Decimal(str(cost_per_kl)) / Decimal('1000'), 4) if cost_per_kl > 0 else 0
+            # Vendor, own vehicle and pipeline totals from one conditional aggregation
+            groups = {
+                'vendor': Q(source__source_type='Vendor'),
+                'rathinam_vehicles': Q(source__isnull=True),
+                'pipeline': Q(source__source_type='Pipeline'),
             }
+            aggregates = {}
+            for key, condition in groups.items():
+                aggregates[f'{key}_liters'] = Sum('liters', filter=condition)
+                aggregates[f'{key}_cost'] = Sum('cost', filter=condition)
+            totals = rollups.aggregate(**aggregates)
             
-            # Pipeline data
-            pipeline_sources = MasterSource.objects.filter(source_type='Pipeline').values_list('id', flat=True)
-            pipeline_data = entries.filter(source_id__in=pipeline_sources).aggregate(
-                total_liters=Sum('total_quantity_liters'),
-                total_cost=Sum('total_cost')
-            )
-            pipeline_kl = float((pipeline_data['total_liters'] or Decimal('0')) / Decimal('1000'))
-            pipeline_cost = float(pipeline_data['total_cost'] or 0)
-            cost_per_kl = round(pipeline_cost / pipeline_kl, 2) if pipeline_kl > 0 else 0
-            result['pipeline'] = {
-                'total_kl': pipeline_kl,
-                'total_cost': pipeline_cost,
-                'cost_per_kl': cost_per_kl,
-                'cost_per_liter': round(Decimal(str(cost_per_kl)) / Decimal('1000'), 4) if cost_per_kl > 0 else 0
-            }
+            result = {}
+            for key in groups:
+                group_kl = liters_to_kl(totals[f'{key}_liters'])
+                group_cost = float(totals[f'{key}_cost'] or 0)
+                cost_per_kl = round(group_cost / group_kl, 2) if group_kl > 0 else 0
+                result[key] = {
+                    'total_kl': group_kl,
+                    'total_cost': group_cost,
+                    'cost_per_kl': cost_per_kl,
+                    'cost_per_liter': round(Decimal(str(cost_per_kl)) / Decimal('1000'), 4) if cost_per_kl > 0 else 0
+                }
             
             return Response(result)
             
@@ -625,38 +347,40 @@ class SiteConsumptionReportView(APIView):
     Unloading Place (Site) Report - Water consumed per site/department
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.all()
+            rollups = DailyWaterRollup.objects.all()
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
             # Get all locations (exclude Loading points)
             locations = MasterLocation.objects.exclude(location_type='Loading')
+            location_totals = totals_by(
+                rollups, 'unloading_location_id',
+                total_liters=Sum('liters'),
+                total_loads=Sum('entry_count'),
+                total_cost=Sum('cost')
+            )
             
             result = []
             for location in locations:
-                location_data = entries.filter(unloading_location=location).aggregate(
-                    total_liters=Sum('total_quantity_liters'),
-                    total_loads=Count('id'),
-                    total_cost=Sum('total_cost')
-                )
-                
-                location_total_kl = float((location_data['total_liters'] or Decimal('0')) / Decimal('1000'))
+                location_data = location_totals.get(location.id, {})
                 
                 result.append({
                     'location_id': location.id,
                     'location_name': location.location_name,
                     'location_type': location.location_type,
-                    'total_kl': location_total_kl,
-                    'total_loads': location_data['total_loads'] or 0,
-                    'total_cost': float(location_data['total_cost'] or 0)
+                    'total_kl': liters_to_kl(location_data.get('total_liters')),
+                    'total_loads': location_data.get('total_loads') or 0,
+                    'total_cost': float(location_data.get('total_cost') or 0)
                 })
             
             # Sort by consumption
@@ -673,31 +397,34 @@ class CapacityUtilizationReportView(APIView):
     Vehicle Capacity Utilization Report - Actual vs capacity analysis
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
             
-            entries = WaterEntry.objects.filter(source__isnull=True)  # Internal vehicles only
+            rollups = DailyWaterRollup.objects.filter(source__isnull=True)  # Internal vehicles only
            
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
             # Get all internal vehicles
             vehicles = MasterInternalVehicle.objects.all()
+            vehicle_totals = totals_by(
+                rollups, 'vehicle_id',
+                total_liters=Sum('liters'),
+                trips=Sum('entry_count')
+            )
             
             result = []
             for vehicle in vehicles:
-                vehicle_entries = entries.filter(vehicle=vehicle)
-                
-                vehicle_data = vehicle_entries.aggregate(
-                    avg_load_liters=Avg('total_quantity_liters'),
-                    trips=Count('id')
-                )
+                vehicle_data = vehicle_totals.get(vehicle.id, {})
                 
-                avg_load = float(vehicle_data['avg_load_liters'] or 0)
+                trips = vehicle_data.get('trips') or 0
+                avg_load = float(vehicle_data['total_liters'] / trips) if trips else 0
                 capacity = float(vehicle.capacity_liters) if vehicle.capacity_liters else 0
                 
                 result.append({
@@ -705,7 +432,7 @@ class CapacityUtilizationReportView(APIView):
                     'capacity_liters': capacity,
                     'avg_load_liters': round(avg_load, 2),
                     'utilization_percentage': round((avg_load / capacity * 100), 2) if capacity > 0 else 0,
-                    'trips': vehicle_data['trips'] or 0
+                    'trips': trips
                 })
             
             return Response(result)
@@ -713,13 +440,14 @@ class CapacityUtilizationReportView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-
 class SiteDetailReportView(APIView):
     """
     Site Detail Report - Detailed water consumption for a specific site by water type
     URL params: location_id
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request, location_id):
         try:
             start_date = request.query_params.get('start_date')
@@ -731,61 +459,35 @@ class SiteDetailReportView(APIView):
             except MasterLocation.DoesNotExist:
                 return Response({'error': 'Location not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            entries = WaterEntry.objects.filter(unloading_location=location)
+            rollups = DailyWaterRollup.objects.filter(unloading_location=location)
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
-            # Overall totals
-            total_data = entries.aggregate(
-                total_liters=Sum('total_quantity_liters'),
-                total_loads=Count('id'),
-                total_cost=Sum('total_cost')
-            )
-            total_data['total_kl'] = (total_data['total_liters'] or Decimal('0')) / Decimal('1000')
+            # Overall totals and by water type in one query
+            total_data = rollups.aggregate(**category_aggregates())
             
-            # By water type
             by_water_type = []
             for water_type in ['Drinking Water', 'Normal Water (Salt)', 'Corporation Water']:
-                if water_type == 'Corporation Water':
-                    type_data = entries.filter(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                elif water_type == 'Drinking Water':
-                    type_data = entries.filter(water_type='Drinking Water').exclude(source__source_type='Pipeline').aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                else:
-                    type_data = entries.filter(water_type=water_type).aggregate(
-                        total_liters=Sum('total_quantity_liters'),
-                        total_cost=Sum('total_cost'),
-                        loads=Count('id')
-                    )
-                
-                type_total_kl = (type_data['total_liters'] or Decimal('0')) / Decimal('1000')
+                prefix, _ = WATER_CATEGORY_FILTERS[water_type]
                 by_water_type.append({
                     'water_type': water_type,
-                    'total_kl': float(type_total_kl),
-                    'total_cost': float(type_data['total_cost'] or 0),
-                    'loads': type_data['loads'] or 0
+                    'total_kl': liters_to_kl(total_data[f'{prefix}_liters']),
+                    'total_cost': float(total_data[f'{prefix}_cost'] or 0),
+                    'loads': total_data[f'{prefix}_entries'] or 0
                 })
             
             # Daily breakdown
-            daily_data = entries.values('entry_date', 'water_type', 'source__source_type').annotate(
-                total_liters=Sum('total_quantity_liters'),
-                cost=Sum('total_cost'),
-                loads=Count('id')
-            ).order_by('entry_date')
+            daily_data = rollups.values('date', 'water_category').annotate(
+                total_liters=Sum('liters'),
+                total_cost=Sum('cost')
+            ).order_by('date')
             
             daily_by_date = {}
             for item in daily_data:
-                date_str = str(item['entry_date'])
+                date_str = str(item['date'])
                 if date_str not in daily_by_date:
                     daily_by_date[date_str] = {
                         'date': date_str,
@@ -799,19 +501,12 @@ class SiteDetailReportView(APIView):
                         'total_cost': 0
                     }
                 
-                # Determine water category
-                if item['source__source_type'] == 'Pipeline':
-                    water_category = 'Corporation Water'
-                elif item['water_type'] == 'Drinking Water':
-                    water_category = 'Drinking Water'
-                else:
-                    water_category = item['water_type']
-                
+                water_category = item['water_category']
                 item_kl = float((item['total_liters'] or Decimal('0')) / Decimal('1000'))
                 daily_by_date[date_str][water_category] += item_kl
-                daily_by_date[date_str][f"{water_category} Cost"] += float(item['cost'] or 0)
+                daily_by_date[date_str][f"{water_category} Cost"] += float(item['total_cost'] or 0)
                 daily_by_date[date_str]['total_kl'] += item_kl
-                daily_by_date[date_str]['total_cost'] += float(item['cost'] or 0)
+                daily_by_date[date_str]['total_cost'] += float(item['total_cost'] or 0)
             
             result = {
                 'location': {
@@ -820,8 +515,8 @@ class SiteDetailReportView(APIView):
                     'type': location.location_type
                 },
                 'totals': {
-                    'total_kl': float(total_data['total_kl']),
-                    'total_loads': total_data['total_loads'] or 0,
+                    'total_kl': liters_to_kl(total_data['total_liters']),
+                    'total_loads': total_data['total_entries'] or 0,
                     'total_cost': float(total_data['total_cost'] or 0)
                 },
                 'by_water_type': by_water_type,
@@ -840,6 +535,8 @@ class VendorDetailReportView(APIView):
     URL params: vendor_id
     Query params: ?start_date=...&end_date=...
     """
+    @conditional_method
+    @cached_report
     def get(self, request, vendor_id):
         try:
             start_date = request.query_params.get('start_date')
@@ -851,38 +548,38 @@ class VendorDetailReportView(APIView):
             except MasterSource.DoesNotExist:
                 return Response({'error': 'Vendor not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            entries = WaterEntry.objects.filter(source=vendor)
+            rollups = DailyWaterRollup.objects.filter(source=vendor)
             
             if start_date:
-                entries = entries.filter(entry_date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
             if end_date:
-                entries = entries.filter(entry_date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
             
             # Overall totals
-            total_data = entries.aggregate(
-                total_liters=Sum('total_quantity_liters'),
-                total_loads=Count('id'),
-                total_cost=Sum('total_cost')
+            total_data = rollups.aggregate(
+                total_liters=Sum('liters'),
+                total_loads=Sum('entry_count'),
+                total_cost=Sum('cost')
             )
             total_data['total_kl'] = (total_data['total_liters'] or Decimal('0')) / Decimal('1000')
             
-            # Daily breakdown
-            daily_data = entries.values('entry_date', 'unloading_location__location_name', 'water_type').annotate(
-                total_liters=Sum('total_quantity_liters'),
-                cost=Sum('total_cost'),
-                loads=Count('id')
-            ).order_by('entry_date')
+            # Daily breakdown (vendor rows are never pipeline, so category == water type)
+            daily_data = rollups.values('date', 'unloading_location__location_name', 'water_category').annotate(
+                total_liters=Sum('liters'),
+                total_cost=Sum('cost'),
+                total_loads=Sum('entry_count')
+            ).order_by('date')
             
             result_daily = []
             for item in daily_data:
                 item_kl = float((item['total_liters'] or Decimal('0')) / Decimal('1000'))
                 result_daily.append({
-                    'date': str(item['entry_date']),
+                    'date': str(item['date']),
                     'location_name': item['unloading_location__location_name'],
-                    'water_type': item['water_type'],
+                    'water_type': item['water_category'],
                     'kl': item_kl,
-                    'cost': float(item['cost'] or 0),
-                    'loads': item['loads'] or 0
+                    'cost': float(item['total_cost'] or 0),
+                    'loads': item['total_loads'] or 0
                 })
             
             result = {
@@ -904,124 +601,133 @@ class VendorDetailReportView(APIView):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class LocationGroupBreakdownReportView(APIView):
+    """
+    Location Group Breakdown - per unloading site totals for every active
+    loading location group
+    Query params: ?start_date=2024-01-01&end_date=2024-12-31&water_category=Normal Water (Salt)
+    """
+    @conditional_method
+    @cached_report
+    def get(self, request):
+        try:
+            start_date = request.query_params.get('start_date')
+            end_date = request.query_params.get('end_date')
+            water_category = request.query_params.get('water_category')
+
+            entries = WaterEntry.objects.filter(loading_location__group__is_active=True)
+
+            if start_date:
+                entries = entries.filter(entry_date__gte=start_date)
+            if end_date:
+                entries = entries.filter(entry_date__lte=end_date)
+            if water_category:
+                entries = entries.filter(water_category=water_category)
+
+            # One query grouped by (group, unloading site)
+            rows = (
+                entries.order_by()
+                .values('loading_location__group_id', 'unloading_location_id', 'unloading_location__location_name')
+                .annotate(**load_size_aggregates('load'))
+            )
+            rows_by_group = {}
+            for row in rows:
+                rows_by_group.setdefault(row['loading_location__group_id'], []).append(row)
+
+            result = []
+            for group in LocationGroup.objects.filter(is_active=True):
+                sites = site_breakdown(rows_by_group.get(group.id, []), 'load')
+                result.append({
+                    'group_id': group.id,
+                    'name': group.name,
+                    'code': group.code,
+                    'total_liters': sum(site['total_liters'] for site in sites),
+                    'total_amount': sum(site['total_amount'] for site in sites),
+                    'sites': sites,
+                })
+
+            return Response(result)
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class RateDetailsReportView(APIView):
     """
     Rate Details Report - Current active rates for all sources
+    Latest rates come from one window-function query per rate table; per KL
+    and per litre costs are calculated when a rate is saved.
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
+            def as_float(value):
+                return float(value) if value is not None else None
+
             # 1. Vendor Rates
             vendors = MasterSource.objects.filter(source_type='Vendor', is_active=True)
-            vendor_rates = []
-            
-            for vendor in vendors:
-                # Get latest rates for this vendor
-                # Normal Water (Salt)
-                normal_rate = RateHistoryVendor.objects.filter(
-                    source=vendor, 
-                    water_type='Normal Water (Salt)'
-                ).order_by('-effective_date').first()
-                
-                # Drinking Water
-                drinking_rate = RateHistoryVendor.objects.filter(
-                    source=vendor, 
-                    water_type='Drinking Water'
-                ).order_by('-effective_date').first()
-                
-                # Calculate missing rates for Normal Water
-                normal_per_kl = None
-                normal_per_litre = None
-                if normal_rate:
-                    normal_per_kl = float(normal_rate.calculated_cost_per_kl) if normal_rate.calculated_cost_per_kl is not None else None
-                    normal_per_litre = float(normal_rate.calculated_cost_per_liter) if normal_rate.calculated_cost_per_liter is not None else None
-                    
-                    # On-the-fly calculation if missing
-                    if normal_rate.cost_type == 'Per_Load' and normal_rate.vehicle_capacity:
-                        if normal_per_kl is None:
-                            normal_per_kl = float(normal_rate.rate_value) / (normal_rate.vehicle_capacity / 1000.0)
-                        if normal_per_litre is None:
-                            normal_per_litre = float(normal_rate.rate_value) / float(normal_rate.vehicle_capacity)
-
-                # Calculate missing rates for Drinking Water
-                drinking_per_kl = None
-                drinking_per_litre = None
-                if drinking_rate:
-                    drinking_per_kl = float(drinking_rate.calculated_cost_per_kl) if drinking_rate.calculated_cost_per_kl is not None else None
-                    drinking_per_litre = float(drinking_rate.calculated_cost_per_liter) if drinking_rate.calculated_cost_per_liter is not None else None
-                    
-                    # On-the-fly calculation if missing
-                    if drinking_rate.cost_type == 'Per_Load' and drinking_rate.vehicle_capacity:
-                        if drinking_per_kl is None:
-                            drinking_per_kl = float(drinking_rate.rate_value) / (drinking_rate.vehicle_capacity / 1000.0)
-                        if drinking_per_litre is None:
-                            drinking_per_litre = float(drinking_rate.rate_value) / float(drinking_rate.vehicle_capacity)
-
-                vendor_rates.append({
+            latest_vendor_rates = {
+                (rate.source_id, rate.water_type): rate
+                for rate in latest_rates(
+                    RateHistoryVendor.objects.filter(source__in=vendors), 'source_id', 'water_type'
+                )
+            }
+
+            def vendor_rate_details(rate):
+                return {
+                    'capacity': rate.vehicle_capacity if rate else None,
+                    'per_load': as_float(rate.rate_value) if rate and rate.cost_type == 'Per_Load' else None,
+                    'per_kl': as_float(rate.calculated_cost_per_kl) if rate else None,
+                    'per_litre': as_float(rate.calculated_cost_per_liter) if rate else None,
+                }
+
+            vendor_rates = [
+                {
                     'vendor_name': vendor.source_name,
                     'is_active': vendor.is_active,
-                    'normal': {
-                        'capacity': normal_rate.vehicle_capacity if normal_rate else None,
-                        'per_load': float(normal_rate.rate_value) if normal_rate and normal_rate.cost_type == 'Per_Load' and normal_rate.rate_value is not None else None,
-                        'per_kl': normal_per_kl,
-                        'per_litre': normal_per_litre,
-                    },
-                    'drinking': {
-                        'capacity': drinking_rate.vehicle_capacity if drinking_rate else None,
-                        'per_load': float(drinking_rate.rate_value) if drinking_rate and drinking_rate.cost_type == 'Per_Load' and drinking_rate.rate_value is not None else None,
-                        'per_kl': drinking_per_kl,
-                        'per_litre': drinking_per_litre,
-                    }
-                })
+                    'normal': vendor_rate_details(latest_vendor_rates.get((vendor.id, 'Normal Water (Salt)'))),
+                    'drinking': vendor_rate_details(latest_vendor_rates.get((vendor.id, 'Drinking Water'))),
+                }
+                for vendor in vendors
+            ]
 
             # 2. Rathinam (Internal) Vehicle Rates
-            internal_vehicles = MasterInternalVehicle.objects.all()
-            internal_rates = []
-            
-            for vehicle in internal_vehicles:
-                # Internal rates are per vehicle + loading location
-                rates = RateHistoryInternalVehicle.objects.filter(
-                    vehicle=vehicle
-                ).order_by('loading_location__location_name', '-effective_date')
-                
-                # Get latest rate for each unique loading location for this vehicle
-                seen_locations = set()
-                location_rates = []
-                
-                for rate in rates:
-                    loc_id = rate.loading_location_id
-                    if loc_id not in seen_locations:
-                        # On-the-fly calculation for internal vehicles
-                        per_kl = float(rate.calculated_cost_per_kl) if rate.calculated_cost_per_kl is not None else None
-                        per_liter = float(rate.calculated_cost_per_liter) if rate.calculated_cost_per_liter is not None else None
-                        
-                        if per_kl is None and rate.cost_per_load is not None and vehicle.capacity_liters:
-                            per_kl = float(rate.cost_per_load) / (vehicle.capacity_liters / 1000.0)
-                            per_liter = per_kl / 1000.0
-
-                        location_rates.append({
-                            'loading_location': rate.loading_location.location_name if rate.loading_location else 'Unknown',
-                            'per_load': float(rate.cost_per_load) if rate.cost_per_load is not None else 0.0,
-                            'per_kl': per_kl,
-                            'per_litre': per_liter,
-                            'effective_date': str(rate.effective_date)
-                        })
-                        seen_locations.add(loc_id)
-                
-                internal_rates.append({
+            # Latest rate of each vehicle + loading location, by location name
+            location_rates = {}
+            vehicle_rates = latest_rates(
+                RateHistoryInternalVehicle.objects.select_related('loading_location'),
+                'vehicle_id', 'loading_location_id',
+            ).order_by('loading_location__location_name')
+            for rate in vehicle_rates:
+                location_rates.setdefault(rate.vehicle_id, []).append({
+                    'loading_location': rate.loading_location.location_name if rate.loading_location else 'Unknown',
+                    'per_load': as_float(rate.cost_per_load) or 0.0,
+                    'per_kl': as_float(rate.calculated_cost_per_kl),
+                    'per_litre': as_float(rate.calculated_cost_per_liter),
+                    'effective_date': str(rate.effective_date)
+                })
+
+            internal_rates = [
+                {
                     'vehicle_name': vehicle.vehicle_name,
                     'capacity': vehicle.capacity_liters,
-                    'location_rates': location_rates
-                })
+                    'location_rates': location_rates.get(vehicle.id, [])
+                }
+                for vehicle in MasterInternalVehicle.objects.all()
+            ]
 
             # 3. Corporation (Pipeline) Rates
             pipelines = MasterSource.objects.filter(source_type='Pipeline', is_active=True)
+            latest_pipeline_rates = {
+                rate.source_id: rate
+                for rate in latest_rates(RateHistoryPipeline.objects.filter(source__in=pipelines), 'source_id')
+            }
             pipeline_rates = []
-            
+
             for pipeline in pipelines:
-                latest_rate = RateHistoryPipeline.objects.filter(
-                    source=pipeline
-                ).order_by('-effective_date').first()
-                
+                latest_rate = latest_pipeline_rates.get(pipeline.id)
+
                 if latest_rate:
                     pipeline_rates.append({
                         'source_name': pipeline.source_name,
@@ -1030,7 +736,6 @@ class RateDetailsReportView(APIView):
                         'effective_date': str(latest_rate.effective_date)
                     })
 
-
             return Response({
                 'vendor_rates': vendor_rates,
                 'internal_rates': internal_rates,
@@ -1044,73 +749,34 @@ class RateDetailsReportView(APIView):
 class DailyYieldReportView(APIView):
     """
     Daily Yield Report - Date-wise breakdown of water yield by location
-    Query params: ?start_date=2024-02-01&end_date=2024-02-28
+    Query params: ?start_date=2024-02-01&end_date=2024-02-28&sparse=true
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
+            sparse = request.query_params.get('sparse', '').lower() == 'true'
             
-            entries = YieldEntry.objects.all().select_related('location')
+            entries = YieldEntry.objects.all()
             
             if start_date:
                 entries = entries.filter(date__gte=start_date)
             if end_date:
                 entries = entries.filter(date__lte=end_date)
             
-            # Group by date
-            daily_data_query = entries.values('date').annotate(
-                total_liters=Sum('yield_liters')
-            ).order_by('date')
-            
-            result_data = []
-            locations = YieldLocation.objects.filter(is_active=True)
+            locations = list(YieldLocation.objects.filter(is_active=True))
             location_names = [loc.location_name for loc in locations]
             
-            for item in daily_data_query:
-                day_date = item['date']
-                day_entries = entries.filter(date=day_date)
-                
-                # Breakdown for this day by location
-                day_breakdown = {}
-                for loc in locations:
-                    loc_yield = day_entries.filter(location=loc).aggregate(
-                        total_liters=Sum('yield_liters')
-                    )['total_liters'] or 0
-                    
-                    day_breakdown[loc.location_name] = {
-                        'yield_kl': float(Decimal(str(loc_yield)) / Decimal('1000'))
-                    }
-
-                total_kl = float(Decimal(str(item['total_liters'] or 0)) / Decimal('1000'))
-                result_data.append({
-                    'date': str(day_date),
-                    'total_kl': total_kl,
-                    'breakdown': day_breakdown
-                })
-
-            # Overall Summary for the selected period
-            overall_summary_data = entries.aggregate(
-                total_liters=Sum('yield_liters')
+            # Date x location matrix and totals from a single grouped query
+            result_data, summary = location_day_matrix(
+                entries, 'yield_liters', locations, 'yield_kl', sparse=sparse
             )
-            overall_total_kl = float(Decimal(str(overall_summary_data['total_liters'] or 0)) / Decimal('1000'))
-            
-            overall_breakdown = {}
-            for loc in locations:
-                loc_total_yield = entries.filter(location=loc).aggregate(
-                    total_liters=Sum('yield_liters')
-                )['total_liters'] or 0
-                
-                overall_breakdown[loc.location_name] = {
-                    'total_kl': float(Decimal(str(loc_total_yield)) / Decimal('1000'))
-                }
 
             response_payload = {
                 'daily_data': result_data,
-                'summary': {
-                    'total_kl': overall_total_kl,
-                    'breakdown': overall_breakdown
-                },
+                'summary': summary,
                 'location_names': location_names
             }
             
@@ -1123,79 +789,40 @@ class DailyYieldReportView(APIView):
 class DailyNormalConsumptionReportView(APIView):
     """
     Daily Normal Water Consumption Report - Date-wise breakdown of water consumption by location
-    Query params: ?start_date=2024-02-01&end_date=2024-02-28
+    Query params: ?start_date=2024-02-01&end_date=2024-02-28&sparse=true
     """
+    @conditional_method
+    @cached_report
     def get(self, request):
         try:
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
+            sparse = request.query_params.get('sparse', '').lower() == 'true'
             
             entries = ConsumptionEntry.objects.filter(
                 location__consumption_type='Normal'
-            ).select_related('location')
+            )
             
             if start_date:
                 entries = entries.filter(date__gte=start_date)
             if end_date:
                 entries = entries.filter(date__lte=end_date)
             
-            # Group by date
-            daily_data_query = entries.values('date').annotate(
-                total_liters=Sum('consumption_liters')
-            ).order_by('date')
-            
-            result_data = []
-            locations = ConsumptionLocation.objects.filter(
+            locations = list(ConsumptionLocation.objects.filter(
                 consumption_type='Normal', 
                 is_active=True
-            ).order_by('sort_order', 'location_name')
+            ).order_by('sort_order', 'location_name'))
             
             location_names = [loc.location_name for loc in locations]
             
-            for item in daily_data_query:
-                day_date = item['date']
-                day_entries = entries.filter(date=day_date)
-                
-                # Breakdown for this day by location
-                day_breakdown = {}
-                for loc in locations:
-                    loc_consumption = day_entries.filter(location=loc).aggregate(
-                        total_liters=Sum('consumption_liters')
-                    )['total_liters'] or 0
-                    
-                    day_breakdown[loc.location_name] = {
-                        'consumption_kl': float(Decimal(str(loc_consumption)) / Decimal('1000'))
-                    }
-
-                total_kl = float(Decimal(str(item['total_liters'] or 0)) / Decimal('1000'))
-                result_data.append({
-                    'date': str(day_date),
-                    'total_kl': total_kl,
-                    'breakdown': day_breakdown
-                })
-
-            # Overall Summary for the selected period
-            overall_summary_data = entries.aggregate(
-                total_liters=Sum('consumption_liters')
+            # Date x location matrix and totals from a single grouped query
+            result_data, summary = location_day_matrix(
+                entries, 'consumption_liters', locations, 'consumption_kl', sparse=sparse
             )
-            overall_total_kl = float(Decimal(str(overall_summary_data['total_liters'] or 0)) / Decimal('1000'))
-            
-            overall_breakdown = {}
-            for loc in locations:
-                loc_total_consumption = entries.filter(location=loc).aggregate(
-                    total_liters=Sum('consumption_liters')
-                )['total_liters'] or 0
-                
-                overall_breakdown[loc.location_name] = {
-                    'total_kl': float(Decimal(str(loc_total_consumption)) / Decimal('1000'))
-                }
 
             response_payload = {
                 'daily_data': result_data,
-                'summary': {
-                    'total_kl': overall_total_kl,
-                    'breakdown': overall_breakdown
-                },
+                'summary': summary,
                 'location_names': location_names
             }
             
@@ -1204,3 +831,60 @@ class DailyNormalConsumptionReportView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+class CostAuditReportView(APIView):
+    """
+    Cost Audit Report - Stored entry costs against the rate history, with the
+    mismatches grouped by source and month
+    Query params: ?start_date=2025-01-01&end_date=2025-12-31
+    """
+    @conditional_method
+    @cached_report
+    def get(self, request):
+        try:
+            start_date = request.query_params.get('start_date')
+            end_date = request.query_params.get('end_date')
+
+            entries = WaterEntry.objects.all()
+            if start_date:
+                entries = entries.filter(entry_date__gte=start_date)
+            if end_date:
+                entries = entries.filter(entry_date__lte=end_date)
+
+            summary, groups = audit_costs(entries)
+
+            def totals(item):
+                return {
+                    'entries': item['entries'],
+                    'mismatches': item['mismatches'],
+                    'stored_cost': float(item['stored_cost']),
+                    'expected_cost': float(item['expected_cost']),
+                    'difference': float(item['stored_cost'] - item['expected_cost']),
+                }
+
+            result = {
+                'mismatches': [
+                    {
+                        'source_id': group['source_id'],
+                        'source_name': group['source_name'],
+                        'month': group['month'].strftime('%Y-%m'),
+                        **totals(group),
+                        'entry_ids': group['entry_ids'],
+                    }
+                    for group in groups
+                ],
+                'summary': totals(summary),
+            }
+
+            return Response(result)
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ReportCacheStatsView(APIView):
+    """
+    Report cache monitoring - hit/miss counters and the current data version
+    """
+    def get(self, request):
+        return Response(cache_stats())
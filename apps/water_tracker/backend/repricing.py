@@ -0,0 +1,143 @@
+"""
+Repricing of stored water entry costs after retroactive rate changes.
+
+Entries are priced when they are saved (``pricing.entry_cost_fields``), so
+inserting or editing a rate history row with a past ``effective_date`` leaves
+the entries it should have priced stale. ``entries_priced_at`` narrows the
+entries to the ones in a rate's key and effective-date window, and
+``reprice_entries`` recomputes their cost fields in memory against
+``pricing.rate_index``, writing back only the changed rows with chunked
+``bulk_update`` calls and refreshing the rollup days they fall on.
+``reprice_rate_write`` does both around a rate history write made through
+the API.
+
+``audit_costs`` runs the same pricing over a date range without writing
+anything and reports where the stored costs disagree with the rate history.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import WaterEntry
+from .pricing import (
+    ENTRY_COST_FIELDS,
+    ENTRY_PRICING_VALUES,
+    RATE_TABLES,
+    RateIndex,
+    entry_cost_fields,
+    rate_index,
+    row_cost_fields,
+)
+from .rollups import refresh_daily_rollup
+
+
+def entries_priced_at(rate, rates=rate_index):
+    """
+    WaterEntry filter for the entries of ``rate``'s key dated while ``rate``
+    is in force.
+    """
+    first, last = rates.window(rate)
+    fields = next(fields for model, fields in RATE_TABLES.values() if isinstance(rate, model))
+    query = Q(entry_date__gte=first, **{field: getattr(rate, field) for field in fields})
+    if last is not None:
+        query &= Q(entry_date__lte=last)
+    return query
+
+
+def _write(changed):
+    WaterEntry.objects.bulk_update(changed, ENTRY_COST_FIELDS)
+    refresh_daily_rollup([entry.entry_date for entry in changed])
+
+
+def reprice_entries(entries, batch_size=1000, dry_run=False, rates=rate_index):
+    """
+    Re-derive ``ENTRY_COST_FIELDS`` of every entry in the ``entries``
+    queryset. Returns ``[(entry, old values)]`` for the entries whose values
+    changed; with ``dry_run`` nothing is written.
+    """
+    changes = []
+    changed = []
+    entries = entries.select_related('source').order_by('pk')
+    with transaction.atomic():
+        for entry in entries.iterator(chunk_size=batch_size):
+            old = {field: getattr(entry, field) for field in ENTRY_COST_FIELDS}
+            new = entry_cost_fields(entry, rates)
+            if new == old:
+                continue
+            for field, value in new.items():
+                setattr(entry, field, value)
+            changes.append((entry, old))
+            changed.append(entry)
+            if len(changed) >= batch_size:
+                if not dry_run:
+                    _write(changed)
+                changed = []
+        if changed and not dry_run:
+            _write(changed)
+    return changes
+
+
+def reprice_rate_write(rate, write):
+    """
+    Call ``write``, which saves or deletes the rate history row ``rate``
+    (None for a new row) and returns the saved row or None, then reprice the
+    entries priced at the row before and after the write, in one transaction.
+
+    The windows and the new costs come from fresh ``RateIndex`` instances
+    read inside the transaction, since ``rate_index`` only drops its rates
+    once the write commits.
+    """
+    with transaction.atomic():
+        query = entries_priced_at(rate, RateIndex()) if rate is not None else Q(pk__in=[])
+        rate = write()
+        rates = RateIndex()
+        if rate is not None:
+            query |= entries_priced_at(rate, rates)
+        return reprice_entries(WaterEntry.objects.filter(query), rates=rates)
+
+
+def audit_costs(entries, rates=rate_index):
+    """
+    Compare the stored ``total_cost`` of every entry in the ``entries``
+    queryset with the cost its rate in force gives now. Entries are read as
+    ``values()`` rows and priced with ``row_cost_fields``.
+
+    Returns ``(summary, groups)``: entry and mismatch counts with stored and
+    expected cost totals over all entries, and the same per source and month
+    for every source and month with a mismatch, with the mismatched entry ids.
+    """
+    summary = {'entries': 0, 'mismatches': 0, 'stored_cost': Decimal('0'), 'expected_cost': Decimal('0')}
+    groups = {}
+    rows = entries.order_by().values('id', 'total_cost', 'source__source_name', *ENTRY_PRICING_VALUES)
+    for row in rows.iterator(chunk_size=2000):
+        stored = row['total_cost']
+        expected = row_cost_fields(row, rates)['total_cost']
+        month = row['entry_date'].replace(day=1)
+        group = groups.get((row['source_id'], month))
+        if group is None:
+            group = groups[(row['source_id'], month)] = {
+                'source_id': row['source_id'],
+                'source_name': row['source__source_name'],
+                'month': month,
+                'entries': 0,
+                'mismatches': 0,
+                'stored_cost': Decimal('0'),
+                'expected_cost': Decimal('0'),
+                'entry_ids': [],
+            }
+        for totals in (summary, group):
+            totals['entries'] += 1
+            totals['stored_cost'] += stored
+            totals['expected_cost'] += expected
+            totals['mismatches'] += stored != expected
+        if stored != expected:
+            group['entry_ids'].append(row['id'])
+
+    mismatched = sorted(
+        (group for group in groups.values() if group['mismatches']),
+        key=lambda group: (group['month'], group['source_name'] or ''),
+    )
+    for group in mismatched:
+        group['entry_ids'].sort()
+    return summary, mismatched
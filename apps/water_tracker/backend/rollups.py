@@ -0,0 +1,181 @@
+"""
+Maintenance of the DailyWaterRollup table.
+
+Reports read purchase totals from DailyWaterRollup instead of scanning raw
+WaterEntry rows. Rows are rebuilt per day: every write to a WaterEntry
+re-aggregates the affected dates inside the same transaction.
+
+Per-site totals of fully closed months are also kept in the ``reports``
+cache so the multi-month dashboard only recomputes the current month. Like
+cached reports they are keyed by the data version, so any write (from any
+process) stops them being read.
+"""
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils.text import slugify
+
+from .models import DailyWaterRollup, MasterSource, WaterEntry
+from .report_cache import REPORT_CACHE_ALIAS, bump_data_version
+
+
+MONTHLY_SITE_TOTALS_KEY = 'water_tracker:monthly_site_totals:{version}:{category}:{month:%Y-%m}'
+
+
+ROLLUP_DIMENSIONS = [
+    'water_category',
+    'water_type',
+    'source_id',
+    'loading_location_id',
+    'unloading_location_id',
+    'vehicle_id',
+]
+
+
+def aggregate_entries(entries):
+    """
+    Yield unsaved DailyWaterRollup rows for ``entries``, one per
+    (date, water category, water type, source, loading, unloading, vehicle)
+    combination.
+    """
+    rows = (
+        entries.order_by()
+        .values('entry_date', *ROLLUP_DIMENSIONS)
+        .annotate(
+            entry_count=Count('id'),
+            loads=Sum('load_count'),
+            liters=Sum('total_quantity_liters'),
+            cost=Sum('total_cost'),
+        )
+    )
+    for row in rows.iterator(chunk_size=2000):
+        yield DailyWaterRollup(
+            date=row['entry_date'],
+            entry_count=row['entry_count'],
+            loads=row['loads'],
+            liters=row['liters'] or 0,
+            cost=row['cost'] or 0,
+            **{field: row[field] for field in ROLLUP_DIMENSIONS},
+        )
+
+
+def recategorise_entries(entries):
+    """
+    Re-derive ``water_category`` of ``entries`` from their source type in one
+    UPDATE, mirroring ``WaterEntry.category_for``. Rows written without
+    ``save()`` (``loaddata``, ``QuerySet.update``) are otherwise left NULL
+    and drop out of the rollup. Returns the number of rows updated.
+    """
+    pipeline_sources = MasterSource.objects.filter(source_type='Pipeline').values('id')
+    return entries.update(
+        water_category=Case(
+            When(source__in=pipeline_sources, then=Value('Corporation Water')),
+            default=F('water_type'),
+        )
+    )
+
+
+def _bulk_insert(rows, batch_size):
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            DailyWaterRollup.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        DailyWaterRollup.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def refresh_daily_rollup(dates):
+    """
+    Recompute the rollup rows of the given entry dates.
+    """
+    dates = {d for d in dates if d}
+    if not dates:
+        return
+    with transaction.atomic():
+        DailyWaterRollup.objects.filter(date__in=dates).delete()
+        _bulk_insert(aggregate_entries(WaterEntry.objects.filter(entry_date__in=dates)), 1000)
+        bump_data_version()
+
+
+def rebuild_daily_rollup(batch_size=1000):
+    """
+    Re-categorise every entry, then drop and rebuild the whole rollup table.
+    Returns the number of rows written.
+    """
+    with transaction.atomic():
+        recategorise_entries(WaterEntry.objects.all())
+        DailyWaterRollup.objects.all().delete()
+        count = _bulk_insert(aggregate_entries(WaterEntry.objects.all()), batch_size)
+        bump_data_version()
+        return count
+
+
+def _site_totals_by_month(water_category, start, end):
+    """
+    ``{month: {site_name: {'volume': kl, 'cost': cost}}}`` for ``start`` to
+    ``end``, from one query grouped by month and unloading location.
+    """
+    rows = (
+        DailyWaterRollup.objects.filter(
+            water_category=water_category, date__gte=start, date__lte=end
+        )
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'unloading_location__location_name')
+        .annotate(liters=Sum('liters'), cost=Sum('cost'))
+        .order_by()
+    )
+    totals = {}
+    for row in rows:
+        site = row['unloading_location__location_name'] or 'Unknown'
+        totals.setdefault(row['month'], {})[site] = {
+            'volume': float(row['liters'] or 0) / 1000,
+            'cost': float(row['cost'] or 0),
+        }
+    return totals
+
+
+def monthly_site_totals(water_category, months, today, version):
+    """
+    Return ``{month: {site_name: {'volume': kl, 'cost': cost}}}`` of
+    ``water_category`` for ``months`` (first-of-month dates) up to ``today``.
+
+    Closed months are read from the cache under data ``version``; the missing
+    ones are computed in one query and cached for
+    ``MONTHLY_SITE_TOTALS_CACHE_TTL`` seconds. The current month is always
+    recomputed.
+    """
+    cache = caches[REPORT_CACHE_ALIAS]
+    current_month = today.replace(day=1)
+    closed = [m for m in months if m < current_month]
+    keys = {
+        m: MONTHLY_SITE_TOTALS_KEY.format(version=version, category=slugify(water_category), month=m)
+        for m in closed
+    }
+    cached = cache.get_many(keys.values())
+    totals = {m: cached[keys[m]] for m in closed if keys[m] in cached}
+
+    missing = [m for m in closed if keys[m] not in cached]
+    if missing:
+        computed = _site_totals_by_month(
+            water_category, missing[0], missing[-1] + relativedelta(months=1, days=-1)
+        )
+        for m in missing:
+            totals[m] = computed.get(m, {})
+        cache.set_many(
+            {keys[m]: totals[m] for m in missing},
+            timeout=settings.MONTHLY_SITE_TOTALS_CACHE_TTL,
+        )
+
+    if current_month in months:
+        totals.update(_site_totals_by_month(water_category, current_month, today))
+        totals.setdefault(current_month, {})
+    return totals
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import (
-    User, MasterLocation, MasterSource, MasterInternalVehicle, MasterVendorVehicle,
+    User, LocationGroup, MasterLocation, MasterSource, MasterInternalVehicle, MasterVendorVehicle,
     RateHistoryInternalVehicle, RateHistoryVendor, RateHistoryPipeline, WaterEntry,
     YieldLocation, YieldEntry, ConsumptionLocation, ConsumptionEntry,
     ConsumptionCategory
@@ -11,6 +11,11 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'role', 'is_active', 'last_login']
 
+class LocationGroupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LocationGroup
+        fields = '__all__'
+
 class MasterLocationSerializer(serializers.ModelSerializer):
     class Meta:
         model = MasterLocation
@@ -61,6 +66,14 @@ class WaterEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = WaterEntry
         fields = '__all__'
+        # Priced on save from the rate history (see WaterEntryViewSet)
+        read_only_fields = [
+            'water_category',
+            'total_cost',
+            'snapshot_cost_per_liter',
+            'snapshot_cost_per_kl',
+            'snapshot_paise_per_liter',
+        ]
 
 
 class YieldLocationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,54 @@
+"""
+Bump the report data version whenever a model that feeds the reports is
+saved or deleted. Bulk writes (``bulk_create``, ``bulk_update``,
+``QuerySet.update``) do not send these signals and call
+``report_cache.bump_data_version`` themselves.
+
+Rate history writes also bump the rates version and drop this process's
+rate index once the transaction commits. Saving an internal vehicle
+re-derives the calculated costs of its rates, which are stored at the
+vehicle's capacity.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import (
+    ConsumptionCategory, ConsumptionEntry, ConsumptionLocation, LocationGroup, MasterInternalVehicle,
+    MasterLocation, MasterSource, MasterVendorVehicle, RateHistoryInternalVehicle, RateHistoryPipeline,
+    RateHistoryVendor, WaterEntry, YieldEntry, YieldLocation
+)
+from .pricing import rate_index
+from .report_cache import bump_data_version
+
+
+RATE_MODELS = [RateHistoryVendor, RateHistoryInternalVehicle, RateHistoryPipeline]
+
+
+REPORT_SOURCE_MODELS = [
+    WaterEntry, YieldEntry, ConsumptionEntry,
+    *RATE_MODELS,
+    # Reports and dropdowns show names and ordering from the master data as well
+    LocationGroup, MasterLocation, MasterSource, MasterInternalVehicle, MasterVendorVehicle,
+    YieldLocation, ConsumptionCategory, ConsumptionLocation,
+]
+
+
+def data_changed(sender, **kwargs):
+    is_rate = sender in RATE_MODELS
+    bump_data_version(rates=is_rate)
+    if is_rate:
+        transaction.on_commit(rate_index.invalidate)
+
+
+def vehicle_saved(sender, instance, raw=False, **kwargs):
+    # Fixture loads may not have the vehicle's rates yet
+    if not raw and instance.refresh_rate_costs():
+        bump_data_version(rates=True)
+        transaction.on_commit(rate_index.invalidate)
+
+
+def connect_signals():
+    for model in REPORT_SOURCE_MODELS:
+        post_save.connect(data_changed, sender=model, dispatch_uid=f'report_version_save_{model.__name__}')
+        post_delete.connect(data_changed, sender=model, dispatch_uid=f'report_version_delete_{model.__name__}')
+    post_save.connect(vehicle_saved, sender=MasterInternalVehicle, dispatch_uid='vehicle_rate_costs')
@@ -2,19 +2,20 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views, reports_views
 from .views import (
-    UserViewSet, MasterLocationViewSet, MasterSourceViewSet,
+    UserViewSet, LocationGroupViewSet, MasterLocationViewSet, MasterSourceViewSet,
     MasterInternalVehicleViewSet, MasterVendorVehicleViewSet,
     RateHistoryInternalVehicleViewSet, RateHistoryVendorViewSet,
     RateHistoryPipelineViewSet, WaterEntryViewSet,
     YieldLocationViewSet, YieldEntryViewSet,
     ConsumptionCategoryViewSet, ConsumptionLocationViewSet, ConsumptionEntryViewSet,
-    CalculateCostView, GetLastPipelineReadingView, GetLastYieldReadingView,
-    GetLastConsumptionReadingView, dashboard_stats,
-    dropdown_data, login_view, multi_month_stats
+    CalculateCostView, CalculateCostBatchView, GetLastPipelineReadingView,
+    GetLastYieldReadingView, GetLastConsumptionReadingView, dashboard_stats,
+    dropdown_data, login_view, logout_view, multi_month_stats
 )
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
+router.register(r'location-groups', LocationGroupViewSet)
 router.register(r'locations', MasterLocationViewSet)
 router.register(r'sources', MasterSourceViewSet)
 router.register(r'internal-vehicles', MasterInternalVehicleViewSet)
@@ -33,7 +34,9 @@ router.register(r'consumption-entries', ConsumptionEntryViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('login', login_view, name='login'),
+    path('logout', logout_view, name='logout'),
     path('calculate-cost', CalculateCostView.as_view(), name='calculate-cost'),
+    path('calculate-cost/batch', CalculateCostBatchView.as_view(), name='calculate-cost-batch'),
     path('last-pipeline-reading', GetLastPipelineReadingView.as_view(), name='last-pipeline-reading'),
     path('last-yield-reading', GetLastYieldReadingView.as_view(), name='last-yield-reading'),
     path('last-consumption-reading', views.GetLastConsumptionReadingView.as_view(), name='last-consumption-reading'),
@@ -55,4 +58,7 @@ urlpatterns = [
     path('reports/site-detail/<int:location_id>/', reports_views.SiteDetailReportView.as_view(), name='site-detail'),
     path('reports/vendor-detail/<int:vendor_id>/', reports_views.VendorDetailReportView.as_view(), name='vendor-detail'),
     path('reports/rate-details/', reports_views.RateDetailsReportView.as_view(), name='rate-details'),
+    path('reports/location-groups/', reports_views.LocationGroupBreakdownReportView.as_view(), name='location-group-breakdown'),
+    path('reports/cost-audit/', reports_views.CostAuditReportView.as_view(), name='cost-audit'),
+    path('reports/cache-stats/', reports_views.ReportCacheStatsView.as_view(), name='report-cache-stats'),
 ]
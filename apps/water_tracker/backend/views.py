@@ -1,13 +1,16 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, action, permission_classes
+from rest_framework.decorators import api_view, action, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.db.models import Sum
+import copy
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal, ROUND_HALF_UP
 from .models import (
     User,
+    AuthToken,
+    LocationGroup,
     MasterLocation,
     MasterSource,
     MasterInternalVehicle,
@@ -16,6 +19,7 @@ from .models import (
     RateHistoryVendor,
     RateHistoryPipeline,
     WaterEntry,
+    DailyWaterRollup,
     YieldLocation,
     YieldEntry,
     ConsumptionCategory,
@@ -24,6 +28,7 @@ from .models import (
 )
 from .serializers import (
     UserSerializer,
+    LocationGroupSerializer,
     MasterLocationSerializer,
     MasterSourceSerializer,
     MasterInternalVehicleSerializer,
@@ -38,7 +43,22 @@ from .serializers import (
     ConsumptionLocationSerializer,
     ConsumptionEntrySerializer,
 )
-from .pagination import StandardResultsSetPagination
+from .pagination import EntryOrderingMixin, StandardResultsSetPagination
+from .authentication import issue_token
+from .conditional import ConditionalGetMixin, conditional_get
+from .exports import EXPORT_RENDERERS, STREAMING_FORMATS, streaming_export
+from .meter_readings import (
+    entries_on,
+    latest_entries_before,
+    previous_readings,
+    repair_successors,
+    upsert_entries,
+)
+from .report_engine import load_size_aggregates, site_breakdown
+from .repricing import reprice_rate_write
+from .pricing import calculate_cost, entry_cost_fields
+from .report_cache import bump_data_version, data_version
+from .rollups import monthly_site_totals, recategorise_entries, refresh_daily_rollup
 from django.db.models import Q
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import authenticate
@@ -50,7 +70,13 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
 
 
-class MasterLocationViewSet(viewsets.ModelViewSet):
+class LocationGroupViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = LocationGroup.objects.all()
+    serializer_class = LocationGroupSerializer
+    pagination_class = None
+
+
+class MasterLocationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MasterLocation.objects.all().order_by('sort_order', 'location_name')
     serializer_class = MasterLocationSerializer
     pagination_class = None
@@ -72,44 +98,74 @@ class MasterLocationViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             for item in orders:
                 MasterLocation.objects.filter(id=item['id']).update(sort_order=item['sort_order'])
+            bump_data_version()
         
         return Response({"message": "Order updated successfully"})
 
 
-class MasterSourceViewSet(viewsets.ModelViewSet):
+class MasterSourceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MasterSource.objects.all()
     serializer_class = MasterSourceSerializer
     pagination_class = None
 
+    def perform_update(self, serializer):
+        previous_type = serializer.instance.source_type
+        with transaction.atomic():
+            source = serializer.save()
+            # Pipeline entries are Corporation Water, so re-categorise this source's entries
+            if source.source_type != previous_type:
+                entries = WaterEntry.objects.filter(source=source)
+                recategorise_entries(entries)
+                refresh_daily_rollup(
+                    entries.values_list("entry_date", flat=True).distinct()
+                )
+
 
-class MasterInternalVehicleViewSet(viewsets.ModelViewSet):
+class MasterInternalVehicleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MasterInternalVehicle.objects.all()
     serializer_class = MasterInternalVehicleSerializer
     pagination_class = None
 
 
-class MasterVendorVehicleViewSet(viewsets.ModelViewSet):
+class MasterVendorVehicleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MasterVendorVehicle.objects.all()
     serializer_class = MasterVendorVehicleSerializer
     pagination_class = None
 
 
-class RateHistoryInternalVehicleViewSet(viewsets.ModelViewSet):
+class RepriceOnRateWriteMixin:
+    """
+    Rate history viewset mixin: every create, update and delete reprices the
+    water entries whose rate in force it changes.
+    """
+    def perform_create(self, serializer):
+        reprice_rate_write(None, serializer.save)
+
+    def perform_update(self, serializer):
+        reprice_rate_write(serializer.instance, serializer.save)
+
+    def perform_destroy(self, instance):
+        def delete():
+            instance.delete()
+        reprice_rate_write(instance, delete)
+
+
+class RateHistoryInternalVehicleViewSet(RepriceOnRateWriteMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = RateHistoryInternalVehicle.objects.all().order_by("-effective_date")
     serializer_class = RateHistoryInternalVehicleSerializer
 
 
-class RateHistoryVendorViewSet(viewsets.ModelViewSet):
+class RateHistoryVendorViewSet(RepriceOnRateWriteMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = RateHistoryVendor.objects.all().order_by("-effective_date")
     serializer_class = RateHistoryVendorSerializer
 
 
-class RateHistoryPipelineViewSet(viewsets.ModelViewSet):
+class RateHistoryPipelineViewSet(RepriceOnRateWriteMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = RateHistoryPipeline.objects.all().order_by("-effective_date")
     serializer_class = RateHistoryPipelineSerializer
 
 
-class YieldLocationViewSet(viewsets.ModelViewSet):
+class YieldLocationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = YieldLocation.objects.all().order_by('yield_type', 'sort_order', 'location_name')
     serializer_class = YieldLocationSerializer
     pagination_class = None
@@ -131,17 +187,22 @@ class YieldLocationViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             for item in orders:
                 YieldLocation.objects.filter(id=item['id']).update(sort_order=item['sort_order'])
+            bump_data_version()
         
         return Response({"message": "Order updated successfully"})
 
 
-class YieldEntryViewSet(viewsets.ModelViewSet):
+class YieldEntryViewSet(EntryOrderingMixin, viewsets.ModelViewSet):
     queryset = YieldEntry.objects.all()
     serializer_class = YieldEntrySerializer
     pagination_class = StandardResultsSetPagination
+    orderings = {
+        "-date": ("-date", "-created_at", "-id"),
+        "date": ("date", "created_at", "id"),
+    }
 
     def get_queryset(self):
-        queryset = YieldEntry.objects.all().order_by("-date", "-created_at")
+        queryset = YieldEntry.objects.select_related("location", "created_by")
         location_id = self.request.query_params.get("location")
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
@@ -153,20 +214,21 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
 
-        ordering = self.request.query_params.get("ordering")
-        if ordering:
-            queryset = queryset.order_by(ordering)
-
-        return queryset
+        return queryset.order_by(*self.get_ordering())
 
     from rest_framework.decorators import action
 
-    @action(detail=False, methods=["get"])
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         """
-        Export yield entries matching filters without pagination
+        Export yield entries matching filters without pagination.
+        ?format=csv|ndjson streams the rows instead of building one response body.
         """
         queryset = self.get_queryset()
+        if request.accepted_renderer.format in STREAMING_FORMATS:
+            return streaming_export(
+                queryset, self.get_serializer(), request.accepted_renderer.format, "yield-entries"
+            )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -195,11 +257,13 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
                               if current_reading > previous_reading else 0)
             yield_liters = yield_difference * 1000
         
-        serializer.save(
-            previous_reading=previous_reading,
-            yield_liters=yield_liters,
-            created_by=(self.request.user if self.request.user.is_authenticated else None),
-        )
+        with transaction.atomic():
+            serializer.save(
+                previous_reading=previous_reading,
+                yield_liters=yield_liters,
+                created_by=(self.request.user if self.request.user.is_authenticated else None),
+            )
+            repair_successors(YieldEntry, [location.id], date)
 
     @action(detail=False, methods=["get"])
     def bulk_data(self, request):
@@ -221,19 +285,19 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
                 {"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        locations = YieldLocation.objects.filter(is_active=True).order_by('yield_type', 'sort_order', 'location_name')
+        locations = list(
+            YieldLocation.objects.filter(is_active=True).order_by('yield_type', 'sort_order', 'location_name')
+        )
+        location_ids = [loc.id for loc in locations]
+
+        # Entries on this exact date and latest entries strictly before it, for all locations
+        existing_entries = entries_on(YieldEntry, location_ids, target_date)
+        prev_entries = latest_entries_before(YieldEntry, location_ids, target_date)
 
         results = []
         for loc in locations:
-            # Entry on this exact date
-            existing_entry = YieldEntry.objects.filter(location=loc, date=target_date).first()
-
-            # Latest entry strictly before this date
-            prev_entry = (
-                YieldEntry.objects.filter(location=loc, date__lt=target_date)
-                .order_by("-date", "-created_at")
-                .first()
-            )
+            existing_entry = existing_entries.get(loc.id)
+            prev_entry = prev_entries.get(loc.id)
 
             results.append(
                 {
@@ -265,64 +329,67 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        created_entries = []
+        created_by = request.user if request.user.is_authenticated else None
         try:
-            with transaction.atomic():
-                for entry in entries_data:
-                    loc_id = entry.get("location_id")
-                    location = YieldLocation.objects.get(id=loc_id)
-                    current_reading = int(entry.get("current_reading") or 0)
-                    yield_liters_manual = entry.get("yield_liters")
-                    comments = entry.get("comments", "")
-
-                    # Skip logic: 
-                    # For normal: skip if current_reading <= 0
-                    # For manual: skip only if both current_reading <= 0 AND yield_liters is empty
-                    if not location.is_manual_yield:
-                        if current_reading <= 0:
-                            continue
-                    else:
-                        if current_reading <= 0 and not yield_liters_manual:
-                            continue
-
-                    prev_entry = (
-                        YieldEntry.objects.filter(
-                            location=location, date__lt=entry_date
-                        )
-                        .order_by("-date", "-created_at")
-                        .first()
-                    )
+            location_ids = {int(entry.get("location_id")) for entry in entries_data}
+            locations = YieldLocation.objects.in_bulk(location_ids)
+            if len(locations) < len(location_ids):
+                raise YieldLocation.DoesNotExist("YieldLocation matching query does not exist.")
+
+            # Previous readings for every submitted location in one query
+            previous = previous_readings(YieldEntry, list(locations), entry_date)
+
+            # One row per location; a later row for the same location wins
+            new_entries = {}
+            for entry in entries_data:
+                location = locations[int(entry.get("location_id"))]
+                current_reading = int(entry.get("current_reading") or 0)
+                yield_liters_manual = entry.get("yield_liters")
+                comments = entry.get("comments", "")
+
+                # Skip logic: 
+                # For normal: skip if current_reading <= 0
+                # For manual: skip only if both current_reading <= 0 AND yield_liters is empty
+                if not location.is_manual_yield:
+                    if current_reading <= 0:
+                        continue
+                else:
+                    if current_reading <= 0 and not yield_liters_manual:
+                        continue
 
-                    previous_reading = prev_entry.current_reading if prev_entry else 0
-                    
-                    yield_liters_to_save = 0
-                    if location.is_manual_yield:
-                        yield_liters_to_save = int(entry.get("yield_liters") or 0)
-                    else:
-                        yield_diff = (
-                            current_reading - previous_reading
-                            if current_reading > previous_reading
-                            else 0
-                        )
-                        yield_liters_to_save = yield_diff * 1000
-
-                    entry_obj, created = YieldEntry.objects.update_or_create(
-                        date=entry_date,
-                        location=location,
-                        defaults={
-                            "current_reading": current_reading,
-                            "previous_reading": previous_reading,
-                            "yield_liters": yield_liters_to_save,
-                            "comments": comments,
-                            "created_by": (
-                                request.user if request.user.is_authenticated else None
-                            ),
-                        }
+                previous_reading = previous[location.id]
+
+                yield_liters_to_save = 0
+                if location.is_manual_yield:
+                    yield_liters_to_save = int(entry.get("yield_liters") or 0)
+                else:
+                    yield_diff = (
+                        current_reading - previous_reading
+                        if current_reading > previous_reading
+                        else 0
                     )
-                    created_entries.append(entry_obj.id)
+                    yield_liters_to_save = yield_diff * 1000
+
+                new_entries[location.id] = YieldEntry(
+                    date=entry_date,
+                    location=location,
+                    current_reading=current_reading,
+                    previous_reading=previous_reading,
+                    yield_liters=yield_liters_to_save,
+                    comments=comments,
+                    created_by=created_by,
+                )
+
+            with transaction.atomic():
+                upsert_entries(
+                    YieldEntry,
+                    list(new_entries.values()),
+                    ["current_reading", "previous_reading", "yield_liters", "comments", "created_by"],
+                )
+                repair_successors(YieldEntry, list(new_entries), entry_date)
 
             return Response(
-                {"message": f"Successfully created {len(created_entries)} entries"},
+                {"message": f"Successfully created {len(new_entries)} entries"},
                 status=status.HTTP_201_CREATED,
             )
         except Exception as e:
@@ -332,6 +399,7 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
         location = serializer.validated_data.get('location', serializer.instance.location)
         current_reading = serializer.validated_data.get('current_reading', serializer.instance.current_reading)
         date = serializer.validated_data.get('date', serializer.instance.date)
+        old_location_id, old_date = serializer.instance.location_id, serializer.instance.date
         
         # Fetch previous reading relative to the updated entry
         last_entry = YieldEntry.objects.filter(
@@ -351,10 +419,19 @@ class YieldEntryViewSet(viewsets.ModelViewSet):
                               if current_reading > previous_reading else 0)
             yield_liters = yield_difference * 1000
         
-        serializer.save(
-            previous_reading=previous_reading,
-            yield_liters=yield_liters
-        )
+        with transaction.atomic():
+            serializer.save(
+                previous_reading=previous_reading,
+                yield_liters=yield_liters
+            )
+            # Relink the entries that followed the old and the new position
+            repair_successors(YieldEntry, [old_location_id], old_date)
+            repair_successors(YieldEntry, [location.id], date)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            repair_successors(YieldEntry, [instance.location_id], instance.date)
 
 
 class GetLastYieldReadingView(APIView):
@@ -379,7 +456,7 @@ class GetLastYieldReadingView(APIView):
         return Response({"previous_reading": 0})
 
 
-class ConsumptionCategoryViewSet(viewsets.ModelViewSet):
+class ConsumptionCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ConsumptionCategory.objects.all()
     serializer_class = ConsumptionCategorySerializer
     pagination_class = None
@@ -395,7 +472,7 @@ class ConsumptionCategoryViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ConsumptionLocationViewSet(viewsets.ModelViewSet):
+class ConsumptionLocationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ConsumptionLocation.objects.all().order_by('sort_order', 'location_name')
     serializer_class = ConsumptionLocationSerializer
     pagination_class = None
@@ -417,17 +494,22 @@ class ConsumptionLocationViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             for item in orders:
                 ConsumptionLocation.objects.filter(id=item['id']).update(sort_order=item['sort_order'])
+            bump_data_version()
         
         return Response({"message": "Order updated successfully"})
 
 
-class ConsumptionEntryViewSet(viewsets.ModelViewSet):
+class ConsumptionEntryViewSet(EntryOrderingMixin, viewsets.ModelViewSet):
     queryset = ConsumptionEntry.objects.all()
     serializer_class = ConsumptionEntrySerializer
     pagination_class = StandardResultsSetPagination
+    orderings = {
+        "-date": ("-date", "-created_at", "-id"),
+        "date": ("date", "created_at", "id"),
+    }
 
     def get_queryset(self):
-        queryset = ConsumptionEntry.objects.all().order_by("-date", "-created_at")
+        queryset = ConsumptionEntry.objects.select_related("location__category", "created_by")
         location_id = self.request.query_params.get("location")
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
@@ -445,18 +527,19 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
 
-        ordering = self.request.query_params.get("ordering")
-        if ordering:
-            queryset = queryset.order_by(ordering)
+        return queryset.order_by(*self.get_ordering())
 
-        return queryset
-
-    @action(detail=False, methods=["get"])
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         """
-        Export consumption entries matching filters without pagination
+        Export consumption entries matching filters without pagination.
+        ?format=csv|ndjson streams the rows instead of building one response body.
         """
         queryset = self.get_queryset()
+        if request.accepted_renderer.format in STREAMING_FORMATS:
+            return streaming_export(
+                queryset, self.get_serializer(), request.accepted_renderer.format, "consumption-entries"
+            )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -479,13 +562,15 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
         )
         consumption_liters = consumption_difference * 1000
 
-        serializer.save(
-            previous_reading=previous_reading,
-            consumption_liters=consumption_liters,
-            created_by=(
-                self.request.user if self.request.user.is_authenticated else None
-            ),
-        )
+        with transaction.atomic():
+            serializer.save(
+                previous_reading=previous_reading,
+                consumption_liters=consumption_liters,
+                created_by=(
+                    self.request.user if self.request.user.is_authenticated else None
+                ),
+            )
+            repair_successors(ConsumptionEntry, [location.id], date)
 
     def perform_update(self, serializer):
         location = serializer.validated_data.get(
@@ -495,6 +580,7 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
             "current_reading", serializer.instance.current_reading
         )
         date = serializer.validated_data.get("date", serializer.instance.date)
+        old_location_id, old_date = serializer.instance.location_id, serializer.instance.date
 
         last_entry = (
             ConsumptionEntry.objects.filter(location=location, date__lte=date)
@@ -511,9 +597,18 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
         )
         consumption_liters = consumption_difference * 1000
 
-        serializer.save(
-            previous_reading=previous_reading, consumption_liters=consumption_liters
-        )
+        with transaction.atomic():
+            serializer.save(
+                previous_reading=previous_reading, consumption_liters=consumption_liters
+            )
+            # Relink the entries that followed the old and the new position
+            repair_successors(ConsumptionEntry, [old_location_id], old_date)
+            repair_successors(ConsumptionEntry, [location.id], date)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            repair_successors(ConsumptionEntry, [instance.location_id], instance.date)
 
     @action(detail=False, methods=["get"])
     def bulk_data(self, request):
@@ -536,21 +631,21 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
                 {"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        locations = ConsumptionLocation.objects.filter(
-            consumption_type=consumption_type, is_active=True
-        ).select_related("category").order_by('sort_order', 'location_name')
+        locations = list(
+            ConsumptionLocation.objects.filter(
+                consumption_type=consumption_type, is_active=True
+            ).select_related("category").order_by('sort_order', 'location_name')
+        )
+        location_ids = [loc.id for loc in locations]
+
+        # Entries on this exact date and latest entries strictly before it, for all locations
+        existing_entries = entries_on(ConsumptionEntry, location_ids, target_date)
+        prev_entries = latest_entries_before(ConsumptionEntry, location_ids, target_date)
 
         results = []
         for loc in locations:
-            # Entry on this exact date
-            existing_entry = ConsumptionEntry.objects.filter(location=loc, date=target_date).first()
-            
-            # Latest entry strictly before this date
-            prev_entry = (
-                ConsumptionEntry.objects.filter(location=loc, date__lt=target_date)
-                .order_by("-date", "-created_at")
-                .first()
-            )
+            existing_entry = existing_entries.get(loc.id)
+            prev_entry = prev_entries.get(loc.id)
 
             results.append(
                 {
@@ -580,51 +675,54 @@ class ConsumptionEntryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        created_entries = []
+        created_by = request.user if request.user.is_authenticated else None
         try:
-            with transaction.atomic():
-                for entry in entries_data:
-                    loc_id = entry.get("location_id")
-                    current_reading = Decimal(str(entry.get("current_reading") or 0))
-                    comments = entry.get("comments", "")
-
-                    if current_reading <= 0:
-                        continue
-
-                    location = ConsumptionLocation.objects.get(id=loc_id)
-
-                    prev_entry = (
-                        ConsumptionEntry.objects.filter(
-                            location=location, date__lt=entry_date
-                        )
-                        .order_by("-date", "-created_at")
-                        .first()
-                    )
+            submitted = [
+                entry for entry in entries_data
+                if Decimal(str(entry.get("current_reading") or 0)) > 0
+            ]
+            location_ids = {int(entry.get("location_id")) for entry in submitted}
+            locations = ConsumptionLocation.objects.in_bulk(location_ids)
+            if len(locations) < len(location_ids):
+                raise ConsumptionLocation.DoesNotExist("ConsumptionLocation matching query does not exist.")
+
+            # Previous readings for every submitted location in one query
+            previous = previous_readings(ConsumptionEntry, list(locations), entry_date)
+
+            # One row per location; a later row for the same location wins
+            new_entries = {}
+            for entry in submitted:
+                location = locations[int(entry.get("location_id"))]
+                current_reading = Decimal(str(entry.get("current_reading") or 0))
+                comments = entry.get("comments", "")
+
+                previous_reading = previous[location.id]
+                consumption_diff = (
+                    current_reading - previous_reading
+                    if current_reading > previous_reading
+                    else 0
+                )
 
-                    previous_reading = prev_entry.current_reading if prev_entry else 0
-                    consumption_diff = (
-                        current_reading - previous_reading
-                        if current_reading > previous_reading
-                        else 0
-                    )
+                new_entries[location.id] = ConsumptionEntry(
+                    date=entry_date,
+                    location=location,
+                    current_reading=current_reading,
+                    previous_reading=previous_reading,
+                    consumption_liters=consumption_diff * 1000,
+                    comments=comments,
+                    created_by=created_by,
+                )
 
-                    entry_obj, created = ConsumptionEntry.objects.update_or_create(
-                        date=entry_date,
-                        location=location,
-                        defaults={
-                            "current_reading": current_reading,
-                            "previous_reading": previous_reading,
-                            "consumption_liters": consumption_diff * 1000,
-                            "comments": comments,
-                            "created_by": (
-                                request.user if request.user.is_authenticated else None
-                            ),
-                        }
-                    )
-                    created_entries.append(entry_obj.id)
+            with transaction.atomic():
+                upsert_entries(
+                    ConsumptionEntry,
+                    list(new_entries.values()),
+                    ["current_reading", "previous_reading", "consumption_liters", "comments", "created_by"],
+                )
+                repair_successors(ConsumptionEntry, list(new_entries), entry_date)
 
             return Response(
-                {"message": f"Successfully created {len(created_entries)} entries"},
+                {"message": f"Successfully created {len(new_entries)} entries"},
                 status=status.HTTP_201_CREATED,
             )
         except Exception as e:
@@ -662,13 +760,20 @@ class GetLastConsumptionReadingView(APIView):
 from .pagination import StandardResultsSetPagination
 
 
-class WaterEntryViewSet(viewsets.ModelViewSet):
+class WaterEntryViewSet(EntryOrderingMixin, viewsets.ModelViewSet):
     queryset = WaterEntry.objects.all()
     serializer_class = WaterEntrySerializer
     pagination_class = StandardResultsSetPagination
+    orderings = {
+        "-entry_date": ("-entry_date", "-created_at", "-id"),
+        "entry_date": ("entry_date", "created_at", "id"),
+    }
 
     def get_queryset(self):
-        queryset = WaterEntry.objects.all().order_by("-entry_date", "-created_at")
+        # Load the names the serializer reads in the same query
+        queryset = WaterEntry.objects.select_related(
+            "source", "loading_location", "unloading_location", "vehicle", "created_by"
+        )
 
         # Filtering
         vehicle_id = self.request.query_params.get("vehicle")
@@ -676,7 +781,6 @@ class WaterEntryViewSet(viewsets.ModelViewSet):
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
         water_type = self.request.query_params.get("water_type")
-        ordering = self.request.query_params.get("ordering")
 
         if vehicle_id:
             queryset = queryset.filter(vehicle_id=vehicle_id)
@@ -707,35 +811,49 @@ class WaterEntryViewSet(viewsets.ModelViewSet):
 
         if water_type:
             if water_type == "Corporation":
-                queryset = queryset.filter(source__source_type="Pipeline")
+                queryset = queryset.filter(water_category="Corporation Water")
             elif (
                 water_type != "All"
             ):  # 'All' is handled by existing default (no filter)
                 queryset = queryset.filter(water_type=water_type)
 
-        if ordering:
-            queryset = queryset.order_by(ordering)
-
-        return queryset
+        return queryset.order_by(*self.get_ordering())
 
     from rest_framework.decorators import action
 
-    @action(detail=False, methods=["get"])
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         """
-        Export entries matching filters without pagination
+        Export entries matching filters without pagination.
+        ?format=csv|ndjson streams the rows instead of building one response body.
         """
         queryset = self.get_queryset()
+        if request.accepted_renderer.format in STREAMING_FORMATS:
+            return streaming_export(
+                queryset, self.get_serializer(), request.accepted_renderer.format, "water-entries"
+            )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     def perform_create(self, serializer):
         self._handle_pipeline_units(serializer)
-        serializer.save(created_by=(self.request.user if self.request.user.is_authenticated else None))
+        self._price_entry(serializer)
+        with transaction.atomic():
+            entry = serializer.save(created_by=(self.request.user if self.request.user.is_authenticated else None))
+            refresh_daily_rollup([entry.entry_date])
 
     def perform_update(self, serializer):
         self._handle_pipeline_units(serializer)
-        serializer.save()
+        self._price_entry(serializer)
+        previous_date = serializer.instance.entry_date
+        with transaction.atomic():
+            entry = serializer.save()
+            refresh_daily_rollup([previous_date, entry.entry_date])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            refresh_daily_rollup([instance.entry_date])
 
     def _handle_pipeline_units(self, serializer):
         # Check if source is Pipeline and convert KL to Liters
@@ -751,6 +869,15 @@ class WaterEntryViewSet(viewsets.ModelViewSet):
                 # Actually, standard behavior is KL -> L
                 serializer.validated_data["total_quantity_liters"] = qty * 1000
 
+    def _price_entry(self, serializer):
+        """
+        Price the entry being saved server-side instead of trusting the client's
+        total_cost, and store the rate snapshots it was priced at.
+        """
+        entry = copy.copy(serializer.instance) if serializer.instance else WaterEntry()
+        for field, value in serializer.validated_data.items():
+            setattr(entry, field, value)
+        serializer.validated_data.update(entry_cost_fields(entry))
 
 
 class GetLastPipelineReadingView(APIView):
@@ -821,132 +948,66 @@ class GetLastPipelineReadingView(APIView):
 class CalculateCostView(APIView):
     def post(self, request):
         try:
-            data = request.data
-            source_type = data.get("source_type")
-            source_id = data.get("source_id")
-            vehicle_id = data.get("vehicle_id")
-            quantity_liters = float(data.get("quantity_liters", 0))
-            entry_date_str = data.get("entry_date")
-
-            if not entry_date_str:
+            if not request.data.get("entry_date"):
                 return Response(
                     {"error": "entry_date is required"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            entry_date = datetime.strptime(entry_date_str, "%Y-%m-%d").date()
-            total_cost = 0
-
-            if source_type == "internal":
-                # Get vehicle rate based on vehicle AND loading_location
-                loading_location_id = data.get("loading_location_id")
+            total_cost = float(calculate_cost(request.data))
 
-                vehicle_rate = (
-                    RateHistoryInternalVehicle.objects.filter(
-                        vehicle_id=vehicle_id,
-                        loading_location_id=loading_location_id,
-                        effective_date__lte=entry_date,
-                    )
-                    .order_by("-effective_date")
-                    .first()
-                )
+            return Response({"total_cost": total_cost})
 
-                if vehicle_rate:
-                    load_count = int(data.get("load_count", 1))
-                    cost_per_load = Decimal(str(vehicle_rate.cost_per_load))
-                    total_cost = cost_per_load * Decimal(load_count)
-
-            elif source_type == "vendor":
-                # Get vendor rate
-                water_type = data.get("water_type", "Drinking Water")
-                vendor_rate = (
-                    RateHistoryVendor.objects.filter(
-                        source_id=source_id,
-                        water_type=water_type,
-                        effective_date__lte=entry_date,
-                    )
-                    .order_by("-effective_date")
-                    .first()
-                )
+        except Exception as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-                if vendor_rate:
-                    is_manual_override = data.get("is_manual_override", False)
-
-                    # OPTIMIZATION: If Per_Load, calculate directly: Rate * Load Count to avoid precision loss
-                    # BUT ONLY IF NOT manual override
-                    if vendor_rate.cost_type == "Per_Load" and not is_manual_override:
-                        load_count = Decimal(str(data.get("load_count", 1)))
-                        total_cost = Decimal(str(vendor_rate.rate_value)) * load_count
-
-                    # Otherwise use stored calculated cost per KL (Partial Loads / Per Liter)
-                    elif vendor_rate.calculated_cost_per_kl:
-                        cost_per_kl = Decimal(str(vendor_rate.calculated_cost_per_kl))
-                        total_cost = (
-                            Decimal(str(quantity_liters)) / Decimal("1000")
-                        ) * cost_per_kl
-
-                    else:
-                        # Fallback calculation
-                        cost_per_kl = Decimal("0")
-                        if vendor_rate.cost_type == "Per_Liter":
-                            cost_per_kl = Decimal(
-                                str(vendor_rate.rate_value)
-                            ) * Decimal("1000")
-                        elif (
-                            vendor_rate.cost_type == "Per_Load"
-                            and vendor_rate.vehicle_capacity
-                        ):
-                            cost_per_kl = (
-                                Decimal(str(vendor_rate.rate_value))
-                                / Decimal(str(vendor_rate.vehicle_capacity))
-                            ) * Decimal("1000")
-
-                        total_cost = (
-                            Decimal(str(quantity_liters)) / Decimal("1000")
-                        ) * cost_per_kl
-
-            elif source_type == "pipeline":
-                # Get pipeline rate
-                pipeline_rate = (
-                    RateHistoryPipeline.objects.filter(
-                        source_id=source_id, effective_date__lte=entry_date
-                    )
-                    .order_by("-effective_date")
-                    .first()
-                )
 
-                if pipeline_rate:
-                    # Pipeline meter readings are in KL, convert to liters (* 1000)
-                    quantity_in_liters = Decimal(str(quantity_liters)) * Decimal("1000")
-                    total_cost = quantity_in_liters * Decimal(
-                        str(pipeline_rate.cost_per_liter)
-                    )
+class CalculateCostBatchView(APIView):
+    """
+    Price every row of a multi-row entry form in one request.
+    Body: {"items": [<calculate-cost fields>, ...]}; the results keep the
+    item order and hold either "total_cost" or a per-item "error".
+    """
+    max_items = 500
 
-            # Round to 2 decimal places for display
-            total_cost = float(
-                total_cost.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    def post(self, request):
+        items = request.data.get("items")
+        if not isinstance(items, list):
+            return Response(
+                {"error": "items must be a list"}, status=status.HTTP_400_BAD_REQUEST
             )
-
-            return Response({"total_cost": total_cost})
-
-        except Exception as e:
+        if len(items) > self.max_items:
             return Response(
-                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": f"At most {self.max_items} items per request"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        results = []
+        for item in items:
+            try:
+                results.append({"total_cost": float(calculate_cost(item))})
+            except Exception as e:
+                results.append({"error": str(e)})
+        return Response({"results": results})
+
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def login_view(request):
     username = request.data.get("username")
     password = request.data.get("password")
     user = authenticate(username=username, password=password)
     if user:
+        key, token = issue_token(user)
         return Response(
             {
                 "message": "Login successful",
                 "user": UserSerializer(user).data,
-                # In a real app, return a token here
+                "token": key,
+                "expires_at": token.expires_at,
             }
         )
     else:
@@ -955,7 +1016,16 @@ def login_view(request):
         )
 
 
+@api_view(["POST"])
+def logout_view(request):
+    # Revoke the token used for this request
+    if isinstance(request.auth, AuthToken):
+        request.auth.delete()
+    return Response({"message": "Logged out"})
+
+
 @api_view(["GET"])
+@conditional_get
 def dashboard_stats(request):
     # ... (rest of the file)
     try:
@@ -963,63 +1033,38 @@ def dashboard_stats(request):
         today = date.today()
         start_of_month = today.replace(day=1)
 
-        # 1. Total Cost (This Month)
-        total_cost = (
-            WaterEntry.objects.filter(entry_date__gte=start_of_month).aggregate(
-                Sum("total_cost")
-            )["total_cost__sum"]
-            or 0
+        # 1-3. Totals and water type breakdown (This Month) from the daily rollup
+        normal_filter = Q(
+            water_category="Normal Water (Salt)",
+            loading_location__group__code="muthu-nagar",
         )
-
-        # 2. Total Volume (This Month) - In KL
-        total_volume_liters = (
-            WaterEntry.objects.filter(entry_date__gte=start_of_month).aggregate(
-                Sum("total_quantity_liters")
-            )["total_quantity_liters__sum"]
-            or 0
+        month_totals = DailyWaterRollup.objects.filter(
+            date__gte=start_of_month
+        ).aggregate(
+            total_cost=Sum("cost"),
+            total_liters=Sum("liters"),
+            corp_liters=Sum("liters", filter=Q(water_category="Corporation Water")),
+            corp_cost=Sum("cost", filter=Q(water_category="Corporation Water")),
+            drink_liters=Sum("liters", filter=Q(water_category="Drinking Water")),
+            drink_cost=Sum("cost", filter=Q(water_category="Drinking Water")),
+            normal_liters=Sum("liters", filter=normal_filter),
+            normal_cost=Sum("cost", filter=normal_filter),
         )
+        total_cost = month_totals["total_cost"] or 0
+        total_volume_liters = month_totals["total_liters"] or 0
         total_volume_kl = float(total_volume_liters) / 1000
 
-        # 3. Water Type Breakdown
         # Corporation (Pipeline)
-        corp_entries = WaterEntry.objects.filter(
-            entry_date__gte=start_of_month, source__source_type="Pipeline"
-        )
-        corp_vol_liters = (
-            corp_entries.aggregate(Sum("total_quantity_liters"))[
-                "total_quantity_liters__sum"
-            ]
-            or 0
-        )
-        corp_cost = corp_entries.aggregate(Sum("total_cost"))["total_cost__sum"] or 0
+        corp_vol_liters = month_totals["corp_liters"] or 0
+        corp_cost = month_totals["corp_cost"] or 0
 
         # Drinking Water (Excluding Pipeline)
-        drink_entries = WaterEntry.objects.filter(
-            entry_date__gte=start_of_month, water_type="Drinking Water"
-        ).exclude(source__source_type="Pipeline")
-        drink_vol_liters = (
-            drink_entries.aggregate(Sum("total_quantity_liters"))[
-                "total_quantity_liters__sum"
-            ]
-            or 0
-        )
-        drink_cost = drink_entries.aggregate(Sum("total_cost"))["total_cost__sum"] or 0
+        drink_vol_liters = month_totals["drink_liters"] or 0
+        drink_cost = month_totals["drink_cost"] or 0
 
-        # Normal Water (Excluding Pipeline) - Filtered by Muthu Nagar Well
-        normal_entries = WaterEntry.objects.filter(
-            entry_date__gte=start_of_month,
-            water_type="Normal Water (Salt)",
-            loading_location__location_name__icontains="Muthu Nagar",
-        ).exclude(source__source_type="Pipeline")
-        normal_vol_liters = (
-            normal_entries.aggregate(Sum("total_quantity_liters"))[
-                "total_quantity_liters__sum"
-            ]
-            or 0
-        )
-        normal_cost = (
-            normal_entries.aggregate(Sum("total_cost"))["total_cost__sum"] or 0
-        )
+        # Normal Water (Excluding Pipeline) - Muthu Nagar location group
+        normal_vol_liters = month_totals["normal_liters"] or 0
+        normal_cost = month_totals["normal_cost"] or 0
 
         # ...        # 3. Breakdown by Water Type
         breakdown = [
@@ -1043,169 +1088,31 @@ def dashboard_stats(request):
             },
         ]
 
-        # 3.1 Normal Water Purchase Breakdown (Location-wise)
-        normal_entries_breakdown = (
-            WaterEntry.objects.filter(
-                entry_date__gte=start_of_month, water_type="Normal Water (Salt)"
-            )
-            .exclude(source__source_type="Pipeline")
-            .select_related("unloading_location")
-        )
-
-        nw_location_data = {}
-
-        for entry in normal_entries_breakdown:
-            loc_name = (
-                entry.unloading_location.location_name
-                if entry.unloading_location
-                else "Unknown"
-            )
-
-            if loc_name not in nw_location_data:
-                nw_location_data[loc_name] = {
-                    "location": loc_name,
-                    "location_id": entry.unloading_location.id if entry.unloading_location else None,
-                    "count_12kl": 0,
-                    "count_6kl": 0,
-                    "total_liters": 0,
-                    "total_amount": 0,
-                }
-
-            # Update totals
-            nw_location_data[loc_name]["total_liters"] += float(
-                entry.total_quantity_liters
-            )
-            nw_location_data[loc_name]["total_amount"] += float(entry.total_cost)
-
-            # Determine Load Size (12KL or 6KL)
-            # Logic: Calculate average load size for this entry
-            qty = float(entry.total_quantity_liters)
-            load_count = entry.load_count if entry.load_count else 1
-            avg_load_size = qty / load_count
-
-            # Thresholds (allowing some variance)
-            if (
-                avg_load_size >= 10000
-            ):  # Broad bucket for 12KL (e.g. 12000, 24000/2=12000)
-                nw_location_data[loc_name]["count_12kl"] += load_count
-            elif avg_load_size >= 4000:  # Broad bucket for 6KL (e.g. 6000)
-                nw_location_data[loc_name]["count_6kl"] += load_count
-            # Else: Ignore or add to separate 'Other' bucket?
-            # For now, if it doesn't fit, it just contributes to Total Liters/Amount.
-
-        # Convert dictionary to list
-        normal_water_breakdown = list(nw_location_data.values())
-        normal_water_breakdown.sort(key=lambda x: x["total_amount"], reverse=True)
-
-        # 3.2 Bannari Water Purchase Breakdown (Location-wise)
-        bannari_entries_breakdown = (
-            WaterEntry.objects.filter(
-                entry_date__gte=start_of_month,
-                water_type="Normal Water (Salt)",
-                loading_location__location_name__icontains="Bannari",
-            )
-            .exclude(source__source_type="Pipeline")
-            .select_related("unloading_location")
+        # 3.1-3.4 Normal Water site breakdowns and daily matrix, from one query
+        # grouped by (loading location group, unloading site, day) with the
+        # load sizes bucketed in SQL
+        normal_entries = WaterEntry.objects.filter(
+            entry_date__gte=start_of_month, water_category="Normal Water (Salt)"
         )
-
-        bw_location_data = {}
-
-        for entry in bannari_entries_breakdown:
-            loc_name = (
-                entry.unloading_location.location_name
-                if entry.unloading_location
-                else "Unknown"
+        site_days = list(
+            normal_entries.order_by()
+            .values(
+                "loading_location__group__code",
+                "unloading_location_id",
+                "unloading_location__location_name",
+                "entry_date",
             )
-
-            if loc_name not in bw_location_data:
-                bw_location_data[loc_name] = {
-                    "location": loc_name,
-                    "location_id": entry.unloading_location.id if entry.unloading_location else None,
-                    "count_12kl": 0,
-                    "count_6kl": 0,
-                    "total_liters": 0,
-                    "total_amount": 0,
-                }
-
-            # Update totals
-            bw_location_data[loc_name]["total_liters"] += float(
-                entry.total_quantity_liters
-            )
-            bw_location_data[loc_name]["total_amount"] += float(entry.total_cost)
-
-            # Determine Load Size
-            qty = float(entry.total_quantity_liters)
-            load_count = entry.load_count if entry.load_count else 1
-            avg_load_size = qty / load_count
-
-            if avg_load_size >= 10000:
-                bw_location_data[loc_name]["count_12kl"] += load_count
-            elif avg_load_size >= 4000:
-                bw_location_data[loc_name]["count_6kl"] += load_count
-
-        bannari_water_breakdown = list(bw_location_data.values())
-        bannari_water_breakdown.sort(key=lambda x: x["total_amount"], reverse=True)
-
-        # 3.3 Varahi Water Purchase Breakdown (Location-wise)
-        varahi_entries_breakdown = (
-            WaterEntry.objects.filter(
-                entry_date__gte=start_of_month,
-                water_type="Normal Water (Salt)",
-                loading_location__location_name__icontains="Varahi",
-            )
-            .exclude(source__source_type="Pipeline")
-            .select_related("unloading_location")
+            .annotate(**load_size_aggregates("load"))
         )
 
-        vw_location_data = {}
+        def group_rows(code):
+            return [row for row in site_days if row["loading_location__group__code"] == code]
 
-        for entry in varahi_entries_breakdown:
-            loc_name = (
-                entry.unloading_location.location_name
-                if entry.unloading_location
-                else "Unknown"
-            )
+        normal_water_breakdown = site_breakdown(site_days, "load")
+        bannari_water_breakdown = site_breakdown(group_rows("bannari"), "load")
+        varahi_water_breakdown = site_breakdown(group_rows("varahi"), "load")
 
-            if loc_name not in vw_location_data:
-                vw_location_data[loc_name] = {
-                    "location": loc_name,
-                    "location_id": entry.unloading_location.id if entry.unloading_location else None,
-                    "count_12kl": 0,
-                    "count_6kl": 0,
-                    "total_liters": 0,
-                    "total_amount": 0,
-                }
-
-            # Update totals
-            vw_location_data[loc_name]["total_liters"] += float(
-                entry.total_quantity_liters
-            )
-            vw_location_data[loc_name]["total_amount"] += float(entry.total_cost)
-
-            # Determine Load Size
-            qty = float(entry.total_quantity_liters)
-            load_count = entry.load_count if entry.load_count else 1
-            avg_load_size = qty / load_count
-
-            if avg_load_size >= 10000:
-                vw_location_data[loc_name]["count_12kl"] += load_count
-            elif avg_load_size >= 4000:
-                vw_location_data[loc_name]["count_6kl"] += load_count
-
-        varahi_water_breakdown = list(vw_location_data.values())
-        varahi_water_breakdown.sort(key=lambda x: x["total_amount"], reverse=True)
-
-        # 3.4 Monthly Consumption Matrix (Daily KL per Location)
-        # Filter for Normal Water (all sources)
-        matrix_entries = (
-            WaterEntry.objects.filter(
-                entry_date__gte=start_of_month, water_type="Normal Water (Salt)"
-            )
-            .exclude(source__source_type="Pipeline")
-            .select_related("unloading_location")
-        )
-
-        # Get number of days in current month
+        # Monthly Consumption Matrix (Daily KL per Location)
         import calendar
 
         _, num_days = calendar.monthrange(today.year, today.month)
@@ -1215,14 +1122,10 @@ def dashboard_stats(request):
         daily_totals = {d: 0 for d in days}
         grand_total = 0
 
-        for entry in matrix_entries:
-            loc_name = (
-                entry.unloading_location.location_name
-                if entry.unloading_location
-                else "Unknown"
-            )
-            day = entry.entry_date.day
-            volume_kl = float(entry.total_quantity_liters) / 1000
+        for row in site_days:
+            loc_name = row["unloading_location__location_name"] or "Unknown"
+            day = row["entry_date"].day
+            volume_kl = float(row["load_liters"]) / 1000
 
             if loc_name not in matrix_data:
                 matrix_data[loc_name] = {
@@ -1232,12 +1135,19 @@ def dashboard_stats(request):
                 }
 
             matrix_data[loc_name]["daily"][day]["volume"] += volume_kl
-            if entry.comments:
-                matrix_data[loc_name]["daily"][day]["comments"].append(entry.comments)
             matrix_data[loc_name]["total"] += volume_kl
             daily_totals[day] += volume_kl
             grand_total += volume_kl
 
+        commented_entries = (
+            normal_entries.exclude(comments__isnull=True)
+            .exclude(comments="")
+            .order_by("id")
+            .values_list("unloading_location__location_name", "entry_date", "comments")
+        )
+        for loc_name, entry_date, comments in commented_entries:
+            matrix_data[loc_name or "Unknown"]["daily"][entry_date.day]["comments"].append(comments)
+
         # Format matrix for frontend
         formatted_matrix = {
             "days": days,
@@ -1252,7 +1162,7 @@ def dashboard_stats(request):
 
         # 4. Recent Activity (Last 5)
         recent_entries = WaterEntry.objects.select_related(
-            "source", "vehicle"
+            "source", "vehicle", "loading_location"
         ).order_by("-entry_date", "-created_at")[:5]
 
         recent_data = []
@@ -1292,6 +1202,7 @@ def dashboard_stats(request):
 
 
 @api_view(["GET"])
+@conditional_get
 def dropdown_data(request):
     try:
         locations = MasterLocation.objects.filter(is_active=True)
@@ -1330,68 +1241,58 @@ def dropdown_data(request):
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Upper bound of the ``months`` parameter of multi_month_stats
+MAX_MULTI_MONTH_STATS_MONTHS = 36
+
+
 @api_view(["GET"])
+@conditional_get
 def multi_month_stats(request):
     try:
         months_count = int(request.query_params.get("months", 3))
+        months_count = min(max(months_count, 1), MAX_MULTI_MONTH_STATS_MONTHS)
         today = date.today()
 
         # Calculate start date (first day of N months ago)
         start_month_date = today.replace(day=1) - relativedelta(months=months_count - 1)
 
-        # Filter entries: Normal Water, excluding Pipeline
-        entries = (
-            WaterEntry.objects.filter(
-                entry_date__gte=start_month_date,
-                entry_date__lte=today,
-                water_type="Normal Water (Salt)",
-            )
-            .exclude(source__source_type="Pipeline")
-            .select_related("unloading_location")
-        )
-
         # Generate list of month objects for the range
-        month_list = []
+        months = []
         curr = start_month_date
         while curr <= today:
-            month_list.append(
-                {"key": curr.strftime("%Y-%m"), "label": curr.strftime("%b %Y")}
-            )
-            # Move to next month
-            if curr.month == 12:
-                curr = curr.replace(year=curr.year + 1, month=1)
-            else:
-                curr = curr.replace(month=curr.month + 1)
+            months.append(curr)
+            curr += relativedelta(months=1)
+        month_list = [
+            {"key": m.strftime("%Y-%m"), "label": m.strftime("%b %Y")} for m in months
+        ]
+
+        # Normal Water totals per month and unloading site; closed months come from the cache
+        site_totals = monthly_site_totals(
+            "Normal Water (Salt)", months, today, data_version(request)[0]
+        )
 
         matrix_data = {}
         monthly_totals = {m["key"]: {"volume": 0, "cost": 0} for m in month_list}
         grand_total = {"volume": 0, "cost": 0}
 
-        for entry in entries:
-            unloading_location = entry.unloading_location
-            loc_name = (
-                unloading_location.location_name if unloading_location else "Unknown"
-            )
-            month_key = entry.entry_date.strftime("%Y-%m")
-            volume_kl = float(entry.total_quantity_liters) / 1000
-            total_cost = float(entry.total_cost or 0)
-
-            if loc_name not in matrix_data:
-                matrix_data[loc_name] = {
-                    "location": loc_name,
-                    "monthly": {m["key"]: {"volume": 0, "cost": 0} for m in month_list},
-                    "total": {"volume": 0, "cost": 0},
-                }
+        for month in months:
+            month_key = month.strftime("%Y-%m")
+            for loc_name, totals in site_totals[month].items():
+                if loc_name not in matrix_data:
+                    matrix_data[loc_name] = {
+                        "location": loc_name,
+                        "monthly": {m["key"]: {"volume": 0, "cost": 0} for m in month_list},
+                        "total": {"volume": 0, "cost": 0},
+                    }
 
-            if month_key in matrix_data[loc_name]["monthly"]:
-                matrix_data[loc_name]["monthly"][month_key]["volume"] += volume_kl
-                matrix_data[loc_name]["monthly"][month_key]["cost"] += total_cost
-                matrix_data[loc_name]["total"]["volume"] += volume_kl
-                matrix_data[loc_name]["total"]["cost"] += total_cost
-                monthly_totals[month_key]["volume"] += volume_kl
-                monthly_totals[month_key]["cost"] += total_cost
-                grand_total["volume"] += volume_kl
-                grand_total["cost"] += total_cost
+                matrix_data[loc_name]["monthly"][month_key]["volume"] += totals["volume"]
+                matrix_data[loc_name]["monthly"][month_key]["cost"] += totals["cost"]
+                matrix_data[loc_name]["total"]["volume"] += totals["volume"]
+                matrix_data[loc_name]["total"]["cost"] += totals["cost"]
+                monthly_totals[month_key]["volume"] += totals["volume"]
+                monthly_totals[month_key]["cost"] += totals["cost"]
+                grand_total["volume"] += totals["volume"]
+                grand_total["cost"] += totals["cost"]
 
         return Response(
             {
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { BrowserRouter as Router, Routes, Route, Link, Navigate } from 'react-router-dom';
 import logo from './assets/logo.png';
+import api from './services/api';
 import Login from './components/Login';
 import Dashboard from './components/Dashboard';
 import Entries from './components/Entries';
@@ -24,7 +25,7 @@ const PrivateRoute = ({ children, isAuthenticated }) => {
 
 function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(
-    !!localStorage.getItem('auth')
+    !!localStorage.getItem('token')
   );
   const [trackEntriesOpen, setTrackEntriesOpen] = useState(false);
   const [masterDataOpen, setMasterDataOpen] = useState(false);
@@ -47,8 +48,13 @@ function App() {
     setTheme(prev => prev === 'light' ? 'dark' : 'light');
   };
 
-  const handleLogout = () => {
-    localStorage.removeItem('auth');
+  const handleLogout = async () => {
+    try {
+      await api.post('logout');
+    } catch (err) {
+      // Token already expired or revoked
+    }
+    localStorage.removeItem('token');
     localStorage.removeItem('user');
     setIsAuthenticated(false);
   };
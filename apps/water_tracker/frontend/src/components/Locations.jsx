@@ -12,6 +12,7 @@ const Locations = () => {
     const [activeTab, setActiveTab] = useState('Purchase'); // 'Purchase', 'Borewell', 'Well', 'Normal Consumption', 'Drinking Consumption', 'Category'
     const [selectedIds, setSelectedIds] = useState([]);
     const [categories, setCategories] = useState([]);
+    const [groups, setGroups] = useState([]);
     const [draggedItemIndex, setDraggedItemIndex] = useState(null);
     const [orderChanged, setOrderChanged] = useState(false);
 
@@ -21,6 +22,7 @@ const Locations = () => {
         yield_type: 'Borewell',       // for Yield
         consumption_type: 'Normal',   // for Consumption
         category: '',                 // for Consumption
+        group: '',                    // for Purchase
         address: '',
         is_manual_yield: false,
         is_active: true
@@ -65,12 +67,24 @@ const Locations = () => {
         }
     }, []);
 
+    const fetchGroups = useCallback(async () => {
+        try {
+            const response = await api.get('location-groups/');
+            setGroups(response.data.results || response.data);
+        } catch (error) {
+            console.error('Failed to fetch location groups:', error);
+        }
+    }, []);
+
     useEffect(() => {
         fetchLocations();
         if (activeTab === 'Normal Water Consumption' || activeTab === 'Drinking Water Consumption') {
             fetchCategories();
         }
-    }, [fetchLocations, activeTab, fetchCategories]);
+        if (activeTab === 'Purchase') {
+            fetchGroups();
+        }
+    }, [fetchLocations, activeTab, fetchCategories, fetchGroups]);
 
     const handleTabChange = (tab) => {
         setActiveTab(tab);
@@ -97,6 +111,7 @@ const Locations = () => {
                     ? (activeTab === 'Normal Water Consumption' ? 'Normal' : 'Drinking')
                     : 'Normal',
                 category: '',
+                group: '',
                 address: '',
                 is_manual_yield: false,
                 is_active: true
@@ -136,21 +151,26 @@ const Locations = () => {
                 payload.yield_type = activeTab;
                 delete payload.location_type;
                 delete payload.consumption_type;
+                delete payload.group;
             } else if (activeTab === 'Normal Water Consumption' || activeTab === 'Drinking Water Consumption') {
                 payload.consumption_type = activeTab === 'Normal Water Consumption' ? 'Normal' : 'Drinking';
                 delete payload.location_type;
                 delete payload.yield_type;
+                delete payload.group;
             } else if (activeTab === 'Category') {
                 delete payload.location_type;
                 delete payload.yield_type;
                 delete payload.consumption_type;
                 delete payload.address;
+                delete payload.group;
                 payload.name = payload.location_name; // ConsumptionCategory uses 'name'
                 delete payload.location_name;
             } else {
                 delete payload.yield_type;
                 delete payload.consumption_type;
                 delete payload.category;
+                // No group selected: new locations are matched to a group by name
+                payload.group = payload.group || null;
             }
 
             if (editingLocation) {
@@ -517,6 +537,25 @@ const Locations = () => {
                         </div>
                     )}
 
+                    {activeTab === 'Purchase' && (
+                        <div>
+                            <label className="block text-sm font-medium text-gray-700 dark:text-slate-300 mb-2">
+                                Group
+                            </label>
+                            <select
+                                name="group"
+                                value={formData.group || ''}
+                                onChange={handleChange}
+                                className="w-full px-3 py-2 border border-gray-300 dark:border-slate-600 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500 bg-white dark:bg-slate-700 dark:text-white"
+                            >
+                                <option value="">No Group</option>
+                                {groups.filter(g => g.is_active || String(g.id) === String(formData.group)).map(group => (
+                                    <option key={group.id} value={group.id}>{group.name}</option>
+                                ))}
+                            </select>
+                        </div>
+                    )}
+
                     {(activeTab === 'Normal Water Consumption' || activeTab === 'Drinking Water Consumption') && (
                         <div>
                             <label className="block text-sm font-medium text-gray-700 dark:text-slate-300 mb-2">
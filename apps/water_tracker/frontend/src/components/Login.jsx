@@ -14,12 +14,8 @@ const Login = ({ setIsAuthenticated }) => {
         try {
             const response = await api.post('login', { username, password });
             if (response.data.user) {
-                // Determine a basic auth token (base64 encoded username:password)
-                // This is insecure for production but mimics the previous app's behavior roughly
-                // Ideally we'd validte a token from the backend.
-                // For now, let's just store the auth string for our interceptor.
-                const authString = btoa(`${username}:${password}`);
-                localStorage.setItem('auth', authString);
+                // Store the API token issued by the backend for our interceptor
+                localStorage.setItem('token', response.data.token);
                 localStorage.setItem('user', JSON.stringify(response.data.user));
 
                 setIsAuthenticated(true);
@@ -14,9 +14,9 @@ const api = axios.create({
 // Add a request interceptor to add the auth token
 api.interceptors.request.use(
     (config) => {
-        const auth = localStorage.getItem('auth');
-        if (auth) {
-            config.headers['Authorization'] = `Basic ${auth}`;
+        const token = localStorage.getItem('token');
+        if (token) {
+            config.headers['Authorization'] = `Token ${token}`;
         }
         return config;
     },
@@ -25,4 +25,17 @@ api.interceptors.request.use(
     }
 );
 
+// Expired or revoked token: drop the session and go back to the login page
+api.interceptors.response.use(
+    (response) => response,
+    (error) => {
+        if (error.response?.status === 401 && localStorage.getItem('token')) {
+            localStorage.removeItem('token');
+            localStorage.removeItem('user');
+            window.location.href = '/login';
+        }
+        return Promise.reject(error);
+    }
+);
+
 export default api;
@@ -0,0 +1,81 @@
+"""
+Compare API throughput with Basic authentication and login tokens.
+
+Runs against a throwaway SQLite database: creates a user, then issues the
+same lightweight API request repeatedly, first with an
+``Authorization: Basic`` header (the password hasher runs on every request)
+and then with the ``Authorization: Token`` header returned by /api/login.
+
+Usage (from the repository root):
+    python apps/water_tracker/scripts/benchmark_auth.py --requests 20
+"""
+import argparse
+import base64
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--requests", type=int, default=20, help="Requests per authentication scheme")
+args = parser.parse_args()
+
+scratch_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch_dir, "benchmark.sqlite3")
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rathinamHR.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+
+from apps.water_tracker.backend.models import User
+
+URL = "/api/last-yield-reading?location_id=1"
+USERNAME = "benchmark"
+PASSWORD = "benchmark-password"
+
+
+def requests_per_second(client, authorization):
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        response = client.get(URL, HTTP_AUTHORIZATION=authorization)
+        assert response.status_code == 200, response.status_code
+    return args.requests / (time.perf_counter() - started)
+
+
+def main():
+    settings.ALLOWED_HOSTS.append("testserver")
+    call_command("migrate", verbosity=0)
+    User.objects.create_user(username=USERNAME, password=PASSWORD)
+    hasher = get_hasher()
+    print(f"Password hasher: {hasher.algorithm}, {getattr(hasher, 'iterations', '?')} iterations")
+
+    client = Client()
+    credentials = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+    basic = requests_per_second(client, f"Basic {credentials}")
+
+    token = client.post(
+        "/api/login", {"username": USERNAME, "password": PASSWORD}, content_type="application/json"
+    ).json()["token"]
+    token_rps = requests_per_second(client, f"Token {token}")
+
+    print(f"Basic authentication: {basic:8.1f} requests/s")
+    print(f"Token authentication: {token_rps:8.1f} requests/s ({token_rps / basic:.0f}x)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        connection.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
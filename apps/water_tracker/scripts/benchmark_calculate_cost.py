@@ -0,0 +1,164 @@
+"""
+Compare pricing a multi-row entry form with calculate-cost and calculate-cost/batch.
+
+Runs against a throwaway SQLite database: seeds vendor, internal vehicle and
+pipeline rates, builds a sheet of line items across all three source types,
+then prices it once with one POST /api/calculate-cost per row and once with a
+single POST /api/calculate-cost/batch, checks both give the same costs and
+prints the time and query count of each.
+
+Usage (from the repository root):
+    python apps/water_tracker/scripts/benchmark_calculate_cost.py --items 60 --repeat 20
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--items", type=int, default=60, help="Line items per entry sheet")
+parser.add_argument("--repeat", type=int, default=20, help="Times each path prices the sheet")
+args = parser.parse_args()
+
+scratch_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch_dir, "benchmark.sqlite3")
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rathinamHR.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.water_tracker.backend.models import (
+    MasterInternalVehicle,
+    MasterLocation,
+    MasterSource,
+    RateHistoryInternalVehicle,
+    RateHistoryPipeline,
+    RateHistoryVendor,
+    User,
+)
+
+START_DATE = date(2024, 1, 1)
+WATER_TYPES = ["Drinking Water", "Normal Water (Salt)"]
+
+
+def random_day():
+    return START_DATE + timedelta(days=random.randrange(700))
+
+
+def seed():
+    random.seed(7)
+    vendors = MasterSource.objects.bulk_create(
+        MasterSource(source_name=f"Vendor {i}", source_type="Vendor") for i in range(10)
+    )
+    pipelines = MasterSource.objects.bulk_create(
+        MasterSource(source_name=f"Pipeline {i}", source_type="Pipeline") for i in range(3)
+    )
+    vehicles = MasterInternalVehicle.objects.bulk_create(
+        MasterInternalVehicle(vehicle_name=f"Vehicle {i}", capacity_liters=12000) for i in range(5)
+    )
+    locations = MasterLocation.objects.bulk_create(
+        MasterLocation(location_name=f"Well {i}", location_type="Loading") for i in range(5)
+    )
+    RateHistoryVendor.objects.bulk_create(
+        RateHistoryVendor(
+            source=random.choice(vendors),
+            water_type=random.choice(WATER_TYPES),
+            cost_type=random.choice(["Per_Load", "Per_Liter"]),
+            rate_value=random.randint(500, 1500),
+            vehicle_capacity=12000,
+            effective_date=random_day(),
+        )
+        for _ in range(300)
+    )
+    RateHistoryInternalVehicle.objects.bulk_create(
+        RateHistoryInternalVehicle(
+            vehicle=random.choice(vehicles),
+            loading_location=random.choice(locations),
+            cost_per_load=random.randint(300, 900),
+            effective_date=random_day(),
+        )
+        for _ in range(300)
+    )
+    RateHistoryPipeline.objects.bulk_create(
+        RateHistoryPipeline(
+            source=random.choice(pipelines),
+            cost_per_liter=random.randint(5, 90) / 1000,
+            effective_date=random_day(),
+        )
+        for _ in range(100)
+    )
+    return vendors, pipelines, vehicles, locations
+
+
+def line_items(vendors, pipelines, vehicles, locations):
+    items = []
+    for _ in range(args.items):
+        item = {
+            "entry_date": (START_DATE + timedelta(days=random.randrange(60, 760))).isoformat(),
+            "quantity_liters": random.choice([6000, 12000, 9000]),
+            "load_count": random.randint(1, 3),
+        }
+        source_type = random.choice(["vendor", "internal", "pipeline"])
+        if source_type == "vendor":
+            item.update(source_id=random.choice(vendors).id, water_type=random.choice(WATER_TYPES))
+        elif source_type == "internal":
+            item.update(vehicle_id=random.choice(vehicles).id, loading_location_id=random.choice(locations).id)
+        else:
+            item.update(source_id=random.choice(pipelines).id, quantity_liters=random.randint(1, 50))
+        items.append({"source_type": source_type, **item})
+    return items
+
+
+def timed(price_sheet):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            costs = price_sheet()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+    return costs, elapsed_ms, len(queries) / args.repeat
+
+
+def main():
+    settings.ALLOWED_HOSTS.append("testserver")
+    call_command("migrate", verbosity=0)
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(username="benchmark", password="benchmark"))
+    items = line_items(*seed())
+
+    def single():
+        return [client.post("/api/calculate-cost", item, format="json").data["total_cost"] for item in items]
+
+    def batch():
+        response = client.post("/api/calculate-cost/batch", {"items": items}, format="json")
+        return [result["total_cost"] for result in response.data["results"]]
+
+    single_costs, single_ms, single_queries = timed(single)
+    batch_costs, batch_ms, batch_queries = timed(batch)
+    assert single_costs == batch_costs, "batch and single-item costs differ"
+
+    print(f"{args.items} line items, priced {args.repeat} times per path")
+    print(f"   calculate-cost x{args.items}: {single_ms:8.1f} ms/sheet  {single_queries:5.1f} queries/sheet")
+    print(f"   calculate-cost/batch: {batch_ms:8.1f} ms/sheet  {batch_queries:5.1f} queries/sheet"
+          f"  ({single_ms / batch_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        connection.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
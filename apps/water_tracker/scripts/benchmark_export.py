@@ -0,0 +1,104 @@
+"""
+Compare peak memory of the JSON and streaming CSV/NDJSON entry exports.
+
+Runs against a throwaway SQLite database: seeds water entries, then requests
+/api/entries/export/ in each format for growing row counts and prints the
+Python heap peak (tracemalloc) while the response body is produced. The JSON
+export grows with the row count; the streaming formats should stay flat.
+
+Usage (from the repository root):
+    python apps/water_tracker/scripts/benchmark_export.py --entries 20000 80000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--entries", type=int, nargs="+", default=[5000, 20000], help="Row counts to export")
+args = parser.parse_args()
+
+scratch_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch_dir, "benchmark.sqlite3")
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rathinamHR.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+
+from apps.water_tracker.backend.authentication import issue_token
+from apps.water_tracker.backend.models import MasterLocation, MasterSource, User, WaterEntry
+
+START_DATE = date(2020, 1, 1)
+
+
+def seed(count):
+    source = MasterSource.objects.get_or_create(source_name="Vendor", source_type="Vendor")[0]
+    location = MasterLocation.objects.get_or_create(location_name="Site")[0]
+    missing = count - WaterEntry.objects.count()
+    WaterEntry.objects.bulk_create(
+        (
+            WaterEntry(
+                entry_date=START_DATE + timedelta(days=i % 2000),
+                source=source,
+                loading_location=location,
+                unloading_location=location,
+                water_type="Normal Water (Salt)",
+                load_count=1,
+                total_quantity_liters=12000,
+                total_cost=1000,
+            )
+            for i in range(missing)
+        ),
+        batch_size=5000,
+    )
+
+
+def export(client, token, export_format):
+    url = "/api/entries/export/" + (f"?format={export_format}" if export_format else "")
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, HTTP_AUTHORIZATION=f"Token {token}")
+    assert response.status_code == 200, response.status_code
+    size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+def main():
+    settings.ALLOWED_HOSTS.append("testserver")
+    call_command("migrate", verbosity=0)
+    token = issue_token(User.objects.create_user(username="benchmark", password="benchmark"))[0]
+    client = Client()
+
+    for count in sorted(args.entries):
+        seed(count)
+        print(f"\n== {count} entries")
+        for export_format in (None, "csv", "ndjson"):
+            peak, size, elapsed = export(client, token, export_format)
+            print(
+                f"   {export_format or 'json':7} peak {peak / 2**20:8.1f} MiB"
+                f"   body {size / 2**20:8.1f} MiB   {elapsed:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        connection.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
@@ -0,0 +1,276 @@
+"""
+Benchmark the composite indexes on the hot filter / ordering paths.
+
+Builds a throwaway SQLite database (or uses --database-url, which must point
+at an empty scratch database), seeds it with a large synthetic data set and
+prints the query plan and timing of each hot query with the composite
+indexes in place and with them dropped.
+
+Usage (from the repository root):
+    python apps/water_tracker/scripts/benchmark_indexes.py --entries 200000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000, help="Water, yield and consumption entries to seed")
+    parser.add_argument("--rates", type=int, default=2000, help="Rate history rows per rate table")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per query when timing")
+    parser.add_argument("--database-url", help="Scratch database to use instead of a temporary SQLite file")
+    return parser.parse_args()
+
+
+args = parse_args()
+scratch_dir = None
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    scratch_dir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch_dir, "benchmark.sqlite3")
+
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rathinamHR.settings")
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+
+from apps.water_tracker.backend.models import (
+    ConsumptionEntry,
+    ConsumptionLocation,
+    MasterInternalVehicle,
+    MasterLocation,
+    MasterSource,
+    RateHistoryInternalVehicle,
+    RateHistoryPipeline,
+    RateHistoryVendor,
+    WaterEntry,
+    YieldEntry,
+    YieldLocation,
+)
+
+START_DATE = date(2020, 1, 1)
+DAYS = 2000
+BATCH_SIZE = 5000
+
+# (model, index fields) added for the hot paths
+BENCHMARKED_INDEXES = [
+    (WaterEntry, ["-entry_date", "-created_at"]),
+    (WaterEntry, ["source", "entry_date"]),
+    (YieldEntry, ["location", "-date", "-created_at"]),
+    (YieldEntry, ["-date", "-created_at"]),
+    (ConsumptionEntry, ["location", "-date", "-created_at"]),
+    (ConsumptionEntry, ["-date", "-created_at"]),
+    (RateHistoryVendor, ["source", "water_type", "effective_date"]),
+    (RateHistoryInternalVehicle, ["vehicle", "loading_location", "effective_date"]),
+    (RateHistoryPipeline, ["source", "effective_date"]),
+]
+
+
+def random_day():
+    return START_DATE + timedelta(days=random.randrange(DAYS))
+
+
+def seed():
+    random.seed(42)
+    locations = MasterLocation.objects.bulk_create(
+        MasterLocation(location_name=f"Location {i}", location_type="Both") for i in range(40)
+    )
+    vendors = MasterSource.objects.bulk_create(
+        MasterSource(source_name=f"Vendor {i}", source_type="Vendor") for i in range(20)
+    )
+    pipelines = MasterSource.objects.bulk_create(
+        MasterSource(source_name=f"Pipeline {i}", source_type="Pipeline") for i in range(5)
+    )
+    vehicles = MasterInternalVehicle.objects.bulk_create(
+        MasterInternalVehicle(vehicle_name=f"Vehicle {i}", capacity_liters=12000) for i in range(20)
+    )
+    yield_locations = YieldLocation.objects.bulk_create(
+        YieldLocation(location_name=f"Borewell {i}", yield_type="Borewell") for i in range(40)
+    )
+    consumption_locations = ConsumptionLocation.objects.bulk_create(
+        ConsumptionLocation(location_name=f"Block {i}", consumption_type="Normal") for i in range(40)
+    )
+
+    RateHistoryVendor.objects.bulk_create(
+        (
+            RateHistoryVendor(
+                source=random.choice(vendors),
+                water_type=random.choice(["Drinking Water", "Normal Water (Salt)"]),
+                cost_type="Per_Load",
+                rate_value=random.randint(500, 1500),
+                vehicle_capacity=12000,
+                effective_date=random_day(),
+            )
+            for _ in range(args.rates)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    RateHistoryInternalVehicle.objects.bulk_create(
+        (
+            RateHistoryInternalVehicle(
+                vehicle=random.choice(vehicles),
+                loading_location=random.choice(locations),
+                cost_per_load=random.randint(300, 900),
+                effective_date=random_day(),
+            )
+            for _ in range(args.rates)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    RateHistoryPipeline.objects.bulk_create(
+        (
+            RateHistoryPipeline(
+                source=random.choice(pipelines),
+                cost_per_liter=random.randint(5, 90) / 1000,
+                effective_date=random_day(),
+            )
+            for _ in range(args.rates)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    sources = vendors + pipelines
+    WaterEntry.objects.bulk_create(
+        (
+            WaterEntry(
+                entry_date=random_day(),
+                source=random.choice(sources),
+                loading_location=random.choice(locations),
+                unloading_location=random.choice(locations),
+                vehicle=random.choice(vehicles),
+                water_type=random.choice(["Drinking Water", "Normal Water (Salt)"]),
+                load_count=1,
+                total_quantity_liters=12000,
+                total_cost=1000,
+            )
+            for _ in range(args.entries)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    for model, locs in ((YieldEntry, yield_locations), (ConsumptionEntry, consumption_locations)):
+        model.objects.bulk_create(
+            (
+                model(date=random_day(), location=random.choice(locs), current_reading=random.randint(0, 10**6))
+                for _ in range(args.entries)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return {
+        "vendor": vendors[0],
+        "pipeline": pipelines[0],
+        "vehicle": vehicles[0],
+        "location": locations[0],
+        "yield_location": yield_locations[0],
+        "consumption_location": consumption_locations[0],
+    }
+
+
+def hot_queries(objs):
+    day = START_DATE + timedelta(days=DAYS // 2)
+    return [
+        ("entries list", WaterEntry.objects.order_by("-entry_date", "-created_at")[:20]),
+        (
+            "last pipeline reading",
+            WaterEntry.objects.filter(
+                source=objs["pipeline"], meter_reading_current__isnull=False, entry_date__lte=day
+            ).order_by("-entry_date", "-id")[:1],
+        ),
+        ("yield entries list", YieldEntry.objects.order_by("-date", "-created_at")[:20]),
+        (
+            "previous yield reading",
+            YieldEntry.objects.filter(location=objs["yield_location"], date__lt=day).order_by("-date", "-created_at")[:1],
+        ),
+        ("consumption entries list", ConsumptionEntry.objects.order_by("-date", "-created_at")[:20]),
+        (
+            "previous consumption reading",
+            ConsumptionEntry.objects.filter(
+                location=objs["consumption_location"], date__lt=day
+            ).order_by("-date", "-created_at")[:1],
+        ),
+        (
+            "vendor rate",
+            RateHistoryVendor.objects.filter(
+                source=objs["vendor"], water_type="Drinking Water", effective_date__lte=day
+            ).order_by("-effective_date")[:1],
+        ),
+        (
+            "internal vehicle rate",
+            RateHistoryInternalVehicle.objects.filter(
+                vehicle=objs["vehicle"], loading_location=objs["location"], effective_date__lte=day
+            ).order_by("-effective_date")[:1],
+        ),
+        (
+            "pipeline rate",
+            RateHistoryPipeline.objects.filter(
+                source=objs["pipeline"], effective_date__lte=day
+            ).order_by("-effective_date")[:1],
+        ),
+    ]
+
+
+def measure(objs):
+    results = {}
+    for name, queryset in hot_queries(objs):
+        plan = queryset.explain()
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            list(queryset.all())
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        results[name] = (plan, elapsed_ms)
+    return results
+
+
+def benchmarked_indexes():
+    for model, fields in BENCHMARKED_INDEXES:
+        index = next(i for i in model._meta.indexes if i.fields == fields)
+        yield model, index
+
+
+def main():
+    print(f"Database: {connection.vendor} ({connection.settings_dict['NAME']})")
+    call_command("migrate", verbosity=0)
+    print(f"Seeding {args.entries} entries per table and {args.rates} rates per rate table...")
+    objs = seed()
+
+    with_indexes = measure(objs)
+    with connection.schema_editor() as editor:
+        for model, index in benchmarked_indexes():
+            editor.remove_index(model, index)
+    without_indexes = measure(objs)
+    with connection.schema_editor() as editor:
+        for model, index in benchmarked_indexes():
+            editor.add_index(model, index)
+
+    for name, (plan, elapsed_ms) in with_indexes.items():
+        old_plan, old_elapsed_ms = without_indexes[name]
+        print(f"\n== {name}: {old_elapsed_ms:.2f} ms -> {elapsed_ms:.2f} ms")
+        print("   without composite indexes:")
+        print("     " + old_plan.replace("\n", "\n     "))
+        print("   with composite indexes:")
+        print("     " + plan.replace("\n", "\n     "))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        connection.close()
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
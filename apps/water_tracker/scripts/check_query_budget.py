@@ -0,0 +1,141 @@
+"""
+Fail if an entry list page or export runs more queries than its budget.
+
+Runs against a throwaway SQLite database: seeds entries with every related
+object set (source, locations, vehicle, category, creator), requests each
+endpoint at two page sizes and compares the query count with QUERY_BUDGETS.
+Serializer fields that lazily load a relation show up as a count that grows
+with the page size. Exits with status 1 when any budget is exceeded.
+
+Usage (from the repository root):
+    python apps/water_tracker/scripts/check_query_budget.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+scratch_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch_dir, "budget.sqlite3")
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rathinamHR.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.water_tracker.backend.models import (
+    ConsumptionCategory,
+    ConsumptionEntry,
+    ConsumptionLocation,
+    MasterInternalVehicle,
+    MasterLocation,
+    MasterSource,
+    User,
+    WaterEntry,
+    YieldEntry,
+    YieldLocation,
+)
+
+ENTRIES = 60
+PAGE_SIZES = [5, 50]
+
+# Queries allowed per request, whatever the page size (count + page, or one export query)
+QUERY_BUDGETS = {
+    "/api/entries/?limit={size}": 2,
+    "/api/yield-entries/?limit={size}": 2,
+    "/api/consumption-entries/?limit={size}": 2,
+    "/api/entries/export/": 1,
+    "/api/yield-entries/export/": 1,
+    "/api/consumption-entries/export/": 1,
+}
+
+
+def seed():
+    user = User.objects.create_user(username="budget", password="budget")
+    sources = MasterSource.objects.bulk_create(
+        MasterSource(source_name=f"Vendor {i}", source_type="Vendor") for i in range(ENTRIES)
+    )
+    locations = MasterLocation.objects.bulk_create(
+        MasterLocation(location_name=f"Site {i}", location_type="Both") for i in range(ENTRIES)
+    )
+    vehicles = MasterInternalVehicle.objects.bulk_create(
+        MasterInternalVehicle(vehicle_name=f"Vehicle {i}", capacity_liters=12000) for i in range(ENTRIES)
+    )
+    categories = ConsumptionCategory.objects.bulk_create(
+        ConsumptionCategory(name=f"Category {i}") for i in range(ENTRIES)
+    )
+    yield_locations = YieldLocation.objects.bulk_create(
+        YieldLocation(location_name=f"Borewell {i}", yield_type="Borewell") for i in range(ENTRIES)
+    )
+    consumption_locations = ConsumptionLocation.objects.bulk_create(
+        ConsumptionLocation(location_name=f"Block {i}", consumption_type="Normal", category=categories[i])
+        for i in range(ENTRIES)
+    )
+
+    # One entry per related object, so lazy loads cannot be served by a shared instance
+    day = date(2026, 1, 1)
+    WaterEntry.objects.bulk_create(
+        WaterEntry(
+            entry_date=day + timedelta(days=i),
+            source=sources[i],
+            loading_location=locations[i],
+            unloading_location=locations[-1 - i],
+            vehicle=vehicles[i],
+            water_type="Normal Water (Salt)",
+            load_count=1,
+            total_quantity_liters=12000,
+            total_cost=1000,
+            created_by=user,
+        )
+        for i in range(ENTRIES)
+    )
+    YieldEntry.objects.bulk_create(
+        YieldEntry(date=day, location=location, current_reading=10, created_by=user)
+        for location in yield_locations
+    )
+    ConsumptionEntry.objects.bulk_create(
+        ConsumptionEntry(date=day, location=location, current_reading=10, created_by=user)
+        for location in consumption_locations
+    )
+    return user
+
+
+def main():
+    settings.ALLOWED_HOSTS.append("testserver")
+    call_command("migrate", verbosity=0)
+    client = APIClient()
+    client.force_authenticate(seed())
+
+    failures = 0
+    for url, budget in QUERY_BUDGETS.items():
+        for size in PAGE_SIZES if "{size}" in url else [None]:
+            path = url.format(size=size)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            ok = response.status_code == 200 and len(queries) <= budget
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {len(queries):3d}/{budget} queries  {response.status_code}  {path}")
+
+    if failures:
+        print(f"\n{failures} request(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        connection.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
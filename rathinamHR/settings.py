@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 import dj_database_url
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
+        "apps.water_tracker.backend.authentication.ExpiringTokenAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -121,6 +123,44 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# "reports" holds cached report results; culled once it reaches MAX_ENTRIES
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "reports": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "water-tracker-reports",
+        "TIMEOUT": int(os.environ.get("REPORT_CACHE_TTL", str(15 * 60))),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", "500")),
+        },
+    },
+}
+
+# Seconds a client may reuse report responses whose date range ends before today
+PAST_RANGE_CACHE_MAX_AGE = int(os.environ.get("PAST_RANGE_CACHE_MAX_AGE", "300"))
+
+# Rows fetched per round trip by the streaming CSV/NDJSON exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+
+# Seconds a paginated entry list's total count is reused for identical filters
+ENTRY_COUNT_CACHE_TTL = int(os.environ.get("ENTRY_COUNT_CACHE_TTL", "600"))
+
+# Filtered entry sets estimated above this many rows return the planner's
+# estimate instead of an exact COUNT(*) (PostgreSQL only); unset = always exact
+ENTRY_COUNT_ESTIMATE_THRESHOLD = (
+    int(os.environ["ENTRY_COUNT_ESTIMATE_THRESHOLD"])
+    if os.environ.get("ENTRY_COUNT_ESTIMATE_THRESHOLD")
+    else None
+)
+
+# Seconds between checks for rate history changes made by other server processes
+RATE_INDEX_CHECK_INTERVAL = float(os.environ.get("RATE_INDEX_CHECK_INTERVAL", "5"))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -170,3 +210,9 @@ STATICFILES_DIRS = [
 ]
 
 AUTH_USER_MODEL = "water_tracker.User"
+
+# Seconds the per-site totals of closed months stay in the reports cache (dashboard multi-month view)
+MONTHLY_SITE_TOTALS_CACHE_TTL = int(os.environ.get("MONTHLY_SITE_TOTALS_CACHE_TTL", str(24 * 60 * 60)))
+
+# Lifetime of API tokens issued at login
+AUTH_TOKEN_TTL = timedelta(hours=int(os.environ.get("AUTH_TOKEN_TTL_HOURS", "12")))